@@ -0,0 +1,373 @@
+# bench.py
+# ──────────────────────────────────────────────────────────────────────────────
+# Banc d’essai hors-ligne du bot (aucune connexion Discord)
+#   python bench.py climat [-n N]          → tables compilées vs chemin historique
+#   python bench.py historique [--days N]  → archive météo : remplissage et requêtes par plage
+#   python bench.py horloges [-n N]        → tables de transitions vs arithmétique à décalage fixe
+#   python bench.py sim [--days 30] [...]  → simulation accélérée des panneaux
+#                                            (transport factice, horloge virtuelle)
+# ──────────────────────────────────────────────────────────────────────────────
+
+import os, sys, argparse, asyncio, tempfile, time
+from datetime import datetime, timedelta, timezone
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, REPO_DIR)
+
+bot = None
+
+def _import_bot(env: dict):
+    """
+    bot.py lit sa config à l’import : token factice, variables du scénario,
+    état dans un dossier jetable (les fichiers d’état réels ne sont jamais touchés).
+    """
+    global bot
+    os.environ.setdefault("DISCORD_TOKEN", "bench")
+    os.environ.setdefault("STATE_BACKEND", "json")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.update(env)
+    os.chdir(tempfile.mkdtemp(prefix="botrp-bench-"))
+    import bot as _bot
+    bot = _bot
+    bot.StateStore.register(CountingStore)  # bot n’est importé qu’ici : sous-classe virtuelle
+    return bot
+
+# ──────────────── Météo : chemin historique (référence) ────────────────
+
+def legacy_season_from_day(day: int) -> str:
+    if 1 <= day <= 8:   return "Hiver"
+    if 9 <= day <= 15:  return "Printemps"
+    if 16 <= day <= 23: return "Été"
+    return "Automne"
+
+def legacy_blend_factor(day: int) -> float:
+    if day in (8, 15, 23):  return 0.2
+    if day in (9, 16, 24):  return 0.8
+    return 0.0
+
+def legacy_meteo_values(continent: str, local: datetime) -> list:
+    """Calcul d’avant la compilation : seuils codés en dur, short_key + N1.get + pick_emoji par champ."""
+    season = legacy_season_from_day(local.day)
+    alpha  = legacy_blend_factor(local.day)
+    season_next = bot.next_season(season)
+    local_day = local.strftime("%Y-%m-%d")
+    out = []
+    for biome_disp in bot.BIOMES[continent]:
+        short = bot.short_key(biome_disp)
+        base_cur  = bot.N1.get((continent, short, season))
+        base_next = bot.N1.get((continent, short, season_next))
+        if base_cur is None or base_next is None:
+            continue
+        t = (1 - alpha) * base_cur + alpha * base_next
+        t += bot.daily_jitter(continent, short, local_day)
+        t = int(round(t))
+        out.append((biome_disp, short, t, bot.pick_emoji(continent, short, season, t)))
+    return out
+
+def _per_call_us(fn, n: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e6
+
+def bench_climat(args):
+    _import_bot({})
+    n = args.n
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    days  = [start + timedelta(days=d) for d in range(62)]
+
+    # équivalence stricte sur deux mois (toutes les saisons, tous les jours de transition)
+    backends = {"python": bot._batch_temps_py}
+    if bot.np is not None:
+        backends["numpy"] = bot._batch_temps_np
+    for name, backend in backends.items():
+        bot._batch_temps = backend
+        bot.forecast_month.cache_clear()
+        for now in days:
+            for cont in bot.BIOMES:
+                local = bot.continent_local_now(cont, now)
+                if bot.meteo_values(cont, local) != legacy_meteo_values(cont, local):
+                    raise SystemExit(f"❌ divergence ({name}) {cont} {local:%Y-%m-%d}")
+
+    local = {c: bot.continent_local_now(c, days[8]) for c in bot.BIOMES}
+    legacy = _per_call_us(lambda: [legacy_meteo_values(c, local[c]) for c in bot.BIOMES], n)
+    fast   = _per_call_us(lambda: [bot.meteo_values(c, local[c]) for c in bot.BIOMES], n)
+
+    def _month():
+        bot.forecast_month.cache_clear()
+        return bot.forecast_month(2025, 1)
+    reps   = max(1, n // 100)
+    months = {}
+    for name, backend in backends.items():
+        bot._batch_temps = backend
+        months[name] = _per_call_us(_month, reps) / 1000
+    legacy_month = _per_call_us(lambda: [legacy_meteo_values(c, local[c]) for c in bot.BIOMES for _ in range(31)], reps) / 1000
+    emoji_legacy = _per_call_us(lambda: bot.pick_emoji("Amérique", "Clairière", "Été", 25), n * 10)
+    emoji_fast   = _per_call_us(lambda: bot.CLIMATE.emoji(1, 1, 2, 25), n * 10)
+
+    print("Météo 5 continents (µs / calcul complet)")
+    print(f"  historique : {legacy:8.1f}")
+    print(f"  prévisions : {fast:8.1f}   (×{legacy / fast:.2f})  lecture (mois en cache)")
+    print("Mois complet : 5 continents × biomes × 31 j (ms)")
+    print(f"  historique : {legacy_month:8.2f}   (jour par jour)")
+    for name, ms in months.items():
+        print(f"  lot {name:7s}: {ms:8.2f}   (×{legacy_month / ms:.2f})")
+    print("Emoji seul (µs / appel)")
+    print(f"  pick_emoji : {emoji_legacy:8.3f}")
+    print(f"  table      : {emoji_fast:8.3f}   (×{emoji_legacy / emoji_fast:.2f})")
+
+# ──────────────── Horloges des continents ────────────────
+
+def legacy_local_day(h: int, m: int, now: datetime) -> tuple:
+    """Calcul d’avant les tables : décalage fixe appliqué à chaque appel."""
+    local = now + timedelta(hours=h, minutes=m)
+    base  = local.replace(hour=0, minute=0, second=0, microsecond=0)
+    start = base - timedelta(hours=h, minutes=m)
+    if local.day < 9:    nxt = base.replace(day=9)
+    elif local.day < 16: nxt = base.replace(day=16)
+    elif local.day < 24: nxt = base.replace(day=24)
+    else:
+        nxt = base.replace(year=base.year + (base.month == 12), month=base.month % 12 + 1, day=1)
+    return (local.date(), legacy_season_from_day(local.day), start, start + timedelta(days=1),
+            nxt - timedelta(hours=h, minutes=m))
+
+IANA_SAMPLES = ("Europe/Paris", "America/Santiago", "Australia/Lord_Howe", "Asia/Kathmandu", "America/St_Johns")
+
+def bench_horloges(args):
+    _import_bot({})
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    steps = [start + timedelta(minutes=7 * k) for k in range(366 * 24 * 60 // 7)]
+
+    # décalages fixes intégrés : identique à l’arithmétique historique
+    for cont, (h, m) in bot.CONTINENT_OFFSETS.items():
+        for now in steps:
+            if tuple(bot.local_day(cont, now)) != legacy_local_day(h, m, now):
+                raise SystemExit(f"❌ divergence {cont} {now:%Y-%m-%d %H:%M}Z")
+
+    # fuseaux IANA (heure d’été, minuit inexistant, décalages à la demi-heure)
+    for name in IANA_SAMPLES:
+        zone = bot.ZoneInfo(name)
+        bot.CONTINENT_ZONES[name] = zone
+        for now in steps:
+            d = bot.local_day(name, now)
+            if not (d.start_utc <= now < d.next_midnight_utc and d.day == now.astimezone(zone).date()
+                    and (d.next_midnight_utc - timedelta(microseconds=1)).astimezone(zone).date() == d.day
+                    and d.next_midnight_utc.astimezone(zone).date() == d.day + timedelta(days=1)
+                    and d.season == legacy_season_from_day(d.day.day)
+                    and d.next_season_utc.astimezone(zone).day in bot.SEASON_START_DAYS):
+                raise SystemExit(f"❌ incohérence {name} {now:%Y-%m-%d %H:%M}Z : {d}")
+
+    n, now = args.n, steps[len(steps) // 2]
+    legacy = _per_call_us(lambda: [legacy_local_day(h, m, now) for h, m in bot.CONTINENT_OFFSETS.values()], n)
+    fast   = _per_call_us(lambda: [bot.local_day(c, now) for c in bot.CONTINENT_OFFSETS], n)
+    build  = _per_call_us(lambda: bot.ContinentClock(bot.ZoneInfo("Europe/Paris"), now.date(), bot.CLOCK_HORIZON_DAYS),
+                          max(1, n // 100))
+    print(f"Vérifié : {len(steps)} instants × {len(bot.CONTINENT_OFFSETS)} décalages fixes + {len(IANA_SAMPLES)} fuseaux IANA")
+    print("Jour local + saison + échéances, 5 continents (µs)")
+    print(f"  arithmétique : {legacy:8.2f}")
+    print(f"  table        : {fast:8.2f}   (×{legacy / fast:.2f})")
+    print(f"Construction d’une table ({bot.CLOCK_HORIZON_DAYS} j) : {build / 1000:.2f} ms")
+
+# ──────────────── Historique ────────────────
+
+def bench_historique(args):
+    _import_bot({})
+    start = datetime(2024, 1, 1).date()
+    days  = [start + timedelta(days=d) for d in range(args.days)]
+    t0 = time.perf_counter()
+    for day in days:
+        rows = [(c, day.isoformat(), short, t, e, bot.season_from_day(day.day))
+                for c in bot.BIOMES for _, short, t, e in bot.forecast_day(c, day)]
+        bot.history.append(rows)
+    fill = time.perf_counter() - t0
+    size = os.path.getsize(bot.HISTORY_DB) + sum(os.path.getsize(bot.HISTORY_DB + x)
+                                                  for x in ("-wal",) if os.path.exists(bot.HISTORY_DB + x))
+    last = days[-1]
+    q_day   = _per_call_us(lambda: bot.history.query("Europe", last, last, "Montagneuses"), args.n)
+    q_week  = _per_call_us(lambda: bot.history.query("Europe", last - timedelta(days=6), last), args.n)
+    q_month = _per_call_us(lambda: bot.history.query("Amérique", last - timedelta(days=30), last), args.n)
+    q_embed = _per_call_us(lambda: bot.history_embed("Amérique", last - timedelta(days=30), last), args.n // 10)
+    t0 = time.perf_counter()
+    pruned = bot.history.prune(last - timedelta(days=365))
+    prune = time.perf_counter() - t0
+
+    print(f"Archive : {args.days} jours × 5 continents, {args.days * sum(map(len, bot.BIOMES.values()))} lignes, "
+          f"{size / 1024:.0f} Kio, remplissage {fill:.2f} s (une transaction par jour)")
+    print("Requêtes (µs)")
+    print(f"  1 jour, 1 biome     : {q_day:8.1f}")
+    print(f"  7 jours, 1 continent: {q_week:8.1f}")
+    print(f"  31 jours, Amérique  : {q_month:8.1f}")
+    print(f"  embed 31 jours      : {q_embed:8.1f}")
+    print(f"Purge > 365 j : {pruned} lignes en {prune * 1000:.0f} ms")
+
+# ──────────────── Simulation accélérée ────────────────
+
+class CountingStore:
+    """Magasin d’état en mémoire qui compte les écritures."""
+
+    def __init__(self):
+        self.docs   = {}
+        self.writes = 0
+        self.bytes  = 0
+
+    def load(self, name):
+        return None
+
+    def save(self, name, payload):
+        self.docs[name] = payload
+        self.writes += 1
+        self.bytes  += len(payload)
+
+    def close(self):
+        pass
+
+def _pct(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+async def _simulate(args, fake):
+    from fakediscord import FakeClient
+
+    loop  = asyncio.get_running_loop()
+    t0    = loop.time()
+    start = datetime.fromisoformat(args.start).replace(tzinfo=timezone.utc)
+    bot.utc_now = lambda: start + timedelta(seconds=loop.time() - t0)
+
+    client = FakeClient(fake)
+    bot.client = client
+    bot.bind_webhook = lambda hook: hook  # FakeWebhook expose déjà send / edit_message / delete_message
+    store = CountingStore()
+    bot.state_saver.store = store
+    bot._CHANNELS[30_000] = client.add_channel(30_000, guild_id=1, name="log")
+    for i in range(args.channels):
+        for kind, base in (("saison", 10_000), ("meteo", 20_000)):
+            ch = client.add_channel(base + i, guild_id=1 + i, name=f"{kind}-{i}")
+            bot.set_guild_channel(ch.guild.id, kind, ch.id)
+            # _get_text_channel vérifie isinstance(discord.TextChannel) : on pré-remplit son cache
+            bot._CHANNELS[ch.id] = ch
+
+    ticks = []  # (durée virtuelle s, CPU s)
+
+    async def handler(jobs):
+        v0, c0 = loop.time(), time.process_time()
+        await bot._run_due_jobs(jobs)
+        ticks.append((loop.time() - v0, time.process_time() - c0))
+
+    v0 = loop.time()
+    await bot.startup()  # passe initiale (lancée par setup_hook)
+    print(f"Démarrage : {loop.time() - v0:.2f} s (virtuelles)")
+    bot.scheduler.plan_all(bot.utc_now())
+    runner = asyncio.create_task(bot.scheduler.run(handler))
+    fake.on_delete.append(bot.on_tracked_messages_deleted)
+    if args.webhook_errors:
+        bot._WEBHOOKS.clear()  # comme après un redémarrage : webhooks à retrouver
+        fake.server_errors["GET /channels/{id}/webhooks"] = args.webhook_errors
+    deleted_at = None
+    if args.delete_at_start and fake.messages:
+        await asyncio.sleep(3600)
+        deleted_at = loop.time()
+        fake.delete_message(next(iter(fake.messages)))
+    await asyncio.sleep(args.days * 86400)
+    await client.close()
+    runner.cancel()
+    try:
+        await runner
+    except asyncio.CancelledError:
+        pass
+    if bot.state_saver._task is not None:
+        bot.state_saver._task.cancel()  # debounce en cours : on vide tout de suite
+    await bot.state_saver.flush()
+    if deleted_at is not None:
+        posts = [t for t, route, *_ in fake.calls if route.startswith("POST") and t >= deleted_at]
+        recovery = f"{posts[0] - deleted_at:.1f} s" if posts else "jamais"
+        print(f"Message supprimé à +1 h → recréé après {recovery}")
+    return ticks, store
+
+def bench_sim(args):
+    from fakediscord import FakeTransport, VirtualClockLoop
+
+    _import_bot({
+        "CHANNEL_SAISON": "10000",
+        "CHANNEL_METEO":  "20000",
+        "CHANNEL_LOG":    "30000",
+        "DIAG_PINGS":   "1" if args.diag_pings else "0",
+        "TIMER_MODE":   args.timer_mode,
+        "PUBLISH_MODE": args.publish_mode,
+        "PANEL_LAYOUT": args.layout,
+        "SCHED_JITTER": str(args.jitter),
+    })
+    no_webhooks = {base + i for base in (10_000, 20_000) for i in range(args.channels)} if args.no_manage_webhooks else ()
+    fake = FakeTransport(latency=args.latency, p_429=args.p429, p_not_found=args.p_not_found, seed=args.seed,
+                         no_webhooks=no_webhooks)
+
+    loop = VirtualClockLoop()
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+    try:
+        ticks, store = loop.run_until_complete(_simulate(args, fake))
+    finally:
+        loop.close()
+    wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+
+    hours = args.days * 24
+    lat   = [v for v, _ in ticks]
+    cpus  = [c * 1000 for _, c in ticks]
+    print(f"Scénario : {args.days} j, TIMER_MODE={args.timer_mode}, PANEL_LAYOUT={args.layout}, PUBLISH_MODE={args.publish_mode}, "
+          f"{args.channels} salon(s)/type, latence {args.latency * 1000:.0f} ms")
+    print(f"  ticks                : {len(ticks)}")
+    print(f"  appels API / heure   : {len(fake.calls) / hours:10.2f}   (total {len(fake.calls)})")
+    for route, n in fake.routes.most_common():
+        print(f"    {route:38s} {n / hours:10.2f}")
+    print(f"  erreurs reçues       : {dict(fake.errors) or '-'}")
+    print(f"  messages présents    : {len(fake.messages)}")
+    print(f"  latence rafraîch.    : p50 {_pct(lat, .5):.2f} s  p95 {_pct(lat, .95):.2f} s  max {max(lat, default=0):.2f} s")
+    print(f"  écritures d’état     : {store.writes} ({store.writes / hours:.2f}/h, {store.bytes / 1024:.1f} Kio)")
+    print(f"  CPU / tick           : moy {sum(cpus) / max(1, len(cpus)):.2f} ms  max {max(cpus, default=0):.2f} ms")
+    print(f"  cache de rendu       : {bot.render_cache.stats()}")
+    print(f"  durée réelle         : {wall:.1f} s (CPU {cpu:.1f} s)")
+    if args.metrics:
+        print()
+        print(bot.metrics.render(), end="")
+
+def main():
+    p = argparse.ArgumentParser(description="Banc d’essai hors-ligne du bot saisons/météo")
+    sub = p.add_subparsers(dest="cmd")
+
+    c = sub.add_parser("climat", help="tables compilées vs chemin historique")
+    c.add_argument("-n", type=int, default=2000)
+    c.set_defaults(func=bench_climat)
+
+    h = sub.add_parser("historique", help="archive météo : remplissage et requêtes par plage")
+    h.add_argument("--days", type=int, default=730)
+    h.add_argument("-n", type=int, default=2000)
+    h.set_defaults(func=bench_historique)
+
+    o = sub.add_parser("horloges", help="tables de transitions vs arithmétique à décalage fixe")
+    o.add_argument("-n", type=int, default=20000)
+    o.set_defaults(func=bench_horloges)
+
+    s = sub.add_parser("sim", help="simulation accélérée des panneaux")
+    s.add_argument("--days", type=float, default=7)
+    s.add_argument("--start", default="2025-01-01T00:00:00")
+    s.add_argument("--timer-mode", choices=("fr", "discord"), default="discord")
+    s.add_argument("--layout", choices=("split", "combined"), default="split")
+    s.add_argument("--channels", type=int, default=1, help="salons abonnés par type de panneau")
+    s.add_argument("--publish-mode", choices=("bot", "webhook"), default="bot")
+    s.add_argument("--no-manage-webhooks", action="store_true", help="refuse « Gérer les webhooks » (repli sur le bot)")
+    s.add_argument("--latency", type=float, default=0.08, help="latence par requête (s)")
+    s.add_argument("--p429", type=float, default=0.0)
+    s.add_argument("--p-not-found", type=float, default=0.0)
+    s.add_argument("--jitter", type=int, default=3)
+    s.add_argument("--delete-at-start", action="store_true", help="supprime un message 1 h après la passe initiale")
+    s.add_argument("--webhook-errors", type=int, default=0, help="500 sur les N premiers GET webhooks après la passe initiale")
+    s.add_argument("--seed", type=int, default=0)
+    s.add_argument("--diag-pings", action="store_true", help="envoie les pings de diagnostic au démarrage")
+    s.add_argument("--metrics", action="store_true", help="affiche les métriques Prometheus en fin de run")
+    s.set_defaults(func=bench_sim)
+
+    args = p.parse_args(sys.argv[1:] or ["climat"])
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
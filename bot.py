@@ -4,19 +4,74 @@
 # – Affiche compte à rebours et “il y a … min” (FR)
 # – Météo mise à jour chaque jour à minuit local, saisons aux seuils 1/9/16/24
 # – Rafraîchit les timers FR toutes les 5 minutes (sans recalcul inutile)
+#   ou, en TIMER_MODE=discord, horodatages natifs + édition sur changement seul
+# – Planificateur à échéances (tas-min) : réveil aux minuits/bascules locales
 # – Anti rate-limit (hash + pauses)
 # ──────────────────────────────────────────────────────────────────────────────
 
-import os, sys, json, asyncio, hashlib, random
-from typing import Optional
-from datetime import datetime, timedelta, timezone
-from zoneinfo import ZoneInfo
+import os, re, sys, json, asyncio, hashlib, random, heapq, time, sqlite3, threading, bisect, functools, calendar
+import logging, logging.handlers, queue
+from abc import ABC, abstractmethod
+from typing import NamedTuple, Optional
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 import discord
+from discord import app_commands
+
+# ───────────────── JOURNAUX ─────────────────
+# Logger structuré et par niveaux ; l’écriture sur stdout se fait dans un
+# thread (QueueHandler → QueueListener) pour ne jamais bloquer la boucle asyncio.
+#   LOG_LEVEL  : DEBUG | INFO (défaut) | WARNING | ERROR
+#   LOG_FORMAT : text (défaut) | json
+
+LOG_LEVEL  = os.getenv("LOG_LEVEL", "INFO").strip().upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").strip().lower()
+
+class _StructFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        ts     = datetime.fromtimestamp(record.created, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+        sub    = record.name.split(".", 1)[-1]
+        fields = getattr(record, "kv", {})
+        if LOG_FORMAT == "json":
+            return json.dumps({"ts": ts, "level": record.levelname, "sub": sub, "msg": record.getMessage(), **fields},
+                              ensure_ascii=False, default=str)
+        line = f"{ts} {record.levelname:<7} {sub:<8} {record.getMessage()}"
+        if fields:
+            line += "  " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+def _setup_logging() -> logging.handlers.QueueListener:
+    q = queue.SimpleQueue()
+    out = logging.StreamHandler(sys.stdout)
+    out.setFormatter(_StructFormatter())
+    listener = logging.handlers.QueueListener(q, out)
+    root = logging.getLogger("botrp")
+    root.addHandler(logging.handlers.QueueHandler(q))
+    root.setLevel(LOG_LEVEL if LOG_LEVEL in logging.getLevelNamesMapping() else "INFO")
+    root.propagate = False
+    listener.start()
+    return listener
+
+_log_listener = _setup_logging()
+
+def get_log(sub: str) -> logging.Logger:
+    return logging.getLogger(f"botrp.{sub}")
+
+def kv(**fields) -> dict:
+    """Champs structurés : log.info("…", extra=kv(cont="Europe", id=123))."""
+    return {"kv": fields}
+
+log_diag  = get_log("diag")
+log_state = get_log("state")
+log_panel = get_log("panneau")
+log_sched = get_log("sched")
 
 # ───────────────── CONFIG ─────────────────
 TOKEN = os.getenv("DISCORD_TOKEN", "").strip()
 if not TOKEN:
-    print("❌ DISCORD_TOKEN manquant (Railway > Variables).")
+    log_diag.critical("DISCORD_TOKEN manquant (Railway > Variables).")
+    _log_listener.stop()
     sys.exit(1)
 
 def _env_int(name: str, default: int) -> int:
@@ -28,12 +83,134 @@ def _env_int(name: str, default: int) -> int:
     except:
         return default
 
+# ───────────────── MÉTRIQUES ─────────────────
+# Compteurs / histogrammes en mémoire, exposés au format texte Prometheus sur
+# http://METRICS_HOST:METRICS_PORT/metrics (désactivé si METRICS_PORT=0).
+
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1").strip()
+METRICS_PORT = _env_int("METRICS_PORT", 0)
+
+class Metrics:
+    BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self):
+        self._meta       = {}  # nom -> (type, aide)
+        self._values     = {}  # (nom, labels) -> valeur (counter/gauge)
+        self._hists      = {}  # (nom, labels) -> [comptes par seau, somme, total]
+        self._collectors = []  # fonctions appelées avant chaque rendu
+
+    def describe(self, name: str, kind: str, help_text: str):
+        self._meta[name] = (kind, help_text)
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        self._values[key] = self._values.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels):
+        self._values[(name, tuple(sorted(labels.items())))] = float(value)
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        h = self._hists.get(key)
+        if h is None:
+            h = self._hists[key] = [[0] * len(self.BUCKETS), 0.0, 0]
+        i = bisect.bisect_left(self.BUCKETS, value)
+        if i < len(self.BUCKETS):
+            h[0][i] += 1  # au-delà du dernier seau : compté seulement dans +Inf
+        h[1] += value
+        h[2] += 1
+
+    def collector(self, fn):
+        self._collectors.append(fn)
+        return fn
+
+    @staticmethod
+    def _fmt_labels(labels: tuple, extra: tuple = ()) -> str:
+        items = labels + extra
+        if not items:
+            return ""
+        return "{" + ",".join(f'{k}="{str(v)}"' for k, v in items) + "}"
+
+    def render(self) -> str:
+        for fn in self._collectors:
+            fn(self)
+        lines, seen = [], set()
+
+        def _head(name):
+            if name not in seen and name in self._meta:
+                kind, help_text = self._meta[name]
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+            seen.add(name)
+
+        for (name, labels), v in sorted(self._values.items()):
+            _head(name)
+            lines.append(f"{name}{self._fmt_labels(labels)} {v:g}")
+        for (name, labels), (counts, total, n) in sorted(self._hists.items()):
+            _head(name)
+            acc = 0
+            for b, c in zip(self.BUCKETS, counts):
+                acc += c
+                lines.append(f"{name}_bucket{self._fmt_labels(labels, (('le', f'{b:g}'),))} {acc}")
+            lines.append(f"{name}_bucket{self._fmt_labels(labels, (('le', '+Inf'),))} {n}")
+            lines.append(f"{name}_sum{self._fmt_labels(labels)} {total:g}")
+            lines.append(f"{name}_count{self._fmt_labels(labels)} {n}")
+        return "\n".join(lines) + "\n"
+
+metrics = Metrics()
+metrics.describe("botrp_rest_requests_total",          "counter",   "Requêtes REST Discord par route et statut")
+metrics.describe("botrp_rest_latency_seconds",         "histogram", "Latence des requêtes REST Discord par route")
+metrics.describe("botrp_tick_duration_seconds",        "histogram", "Durée d’un passage du planificateur")
+metrics.describe("botrp_panel_updates_total",          "counter",   "Mises à jour de panneaux (edited/created/skipped/failed)")
+metrics.describe("botrp_ratelimit_wait_seconds_total", "counter",   "Temps passé à attendre un seau de rate-limit")
+metrics.describe("botrp_ratelimited_total",            "counter",   "429 / RateLimited reçus")
+metrics.describe("botrp_state_save_seconds",           "histogram", "Durée d’écriture d’un document d’état")
+metrics.describe("botrp_render_cache_total",           "counter",   "Accès au cache de rendu (hit/miss)")
+metrics.describe("botrp_tracked_deleted_total",        "counter",   "Panneaux supprimés détectés via la gateway")
+
+async def start_metrics_server():
+    """Serveur aiohttp (déjà installé avec discord.py) ; retourne le runner ou None."""
+    if not METRICS_PORT:
+        return None
+    from aiohttp import web
+
+    async def _handle(_request):
+        return web.Response(text=metrics.render(), headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"})
+
+    app = web.Application()
+    app.router.add_get("/metrics", _handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, METRICS_HOST, METRICS_PORT).start()
+    log_diag.info("métriques exposées", extra=kv(url=f"http://{METRICS_HOST}:{METRICS_PORT}/metrics"))
+    return runner
+
 # Mets 0 si tu utilises exclusivement les Variables Railway.
 CHANNEL_SAISON = _env_int("CHANNEL_SAISON", 0)
 CHANNEL_METEO  = _env_int("CHANNEL_METEO",  0)
 CHANNEL_LOG    = _env_int("CHANNEL_LOG",    0)
 
-# Offsets moyens par rapport à l’UTC (h, m) pour la logique locale
+# 1 → discord.AutoShardedClient (un seul processus pour de nombreux serveurs RP)
+SHARDED = _env_int("SHARDED", 0)
+
+# Rendu des comptes à rebours :
+#  - "fr"      → texte « dans 2 j 3 h » recalculé et réédité à chaque tick
+#  - "discord" → horodatage natif <t:epoch:R> (mis à jour côté client) ;
+#                on n’édite plus que si la signature change
+TIMER_MODE = os.getenv("TIMER_MODE", "fr").strip().lower()
+NATIVE_TIMERS = TIMER_MODE == "discord"
+# Forme du rendu (minuteurs, en-têtes, pied) : incluse dans les signatures pour qu’un
+# changement de TIMER_MODE réédite les messages au lieu de les croire à jour
+RENDER_TAG = f"timers={TIMER_MODE}"
+
+# Disposition des panneaux :
+#  - "split"    → un message par continent (5 messages par salon)
+#  - "combined" → un seul message multi-embeds par salon (1 édition par rafraîchissement)
+PANEL_LAYOUT = os.getenv("PANEL_LAYOUT", "split").strip().lower()
+COMBINED_PANELS = PANEL_LAYOUT == "combined"
+
+# Offsets moyens par rapport à l’UTC (h, m) pour la logique locale ; le fichier
+# climatique peut les remplacer par un vrai fuseau IANA (heure d’été comprise)
 CONTINENT_OFFSETS = {
     "Afrique":  (+1, 30),
     "Amérique": (-6, -30),
@@ -42,19 +219,16 @@ CONTINENT_OFFSETS = {
     "Océanie":  (+4, 15),
 }
 
-SEASON_EMOJI = {"Hiver":"❄️","Printemps":"🌱","Été":"☀️","Automne":"🍂"}
+def fixed_zone(h: int, m: int) -> timezone:
+    return timezone(timedelta(hours=h, minutes=m))
+
+CONTINENT_ZONES = {cont: fixed_zone(h, m) for cont, (h, m) in CONTINENT_OFFSETS.items()}
 
-PARIS_TZ = ZoneInfo("Europe/Paris")
+SEASON_EMOJI = {"Hiver":"❄️","Printemps":"🌱","Été":"☀️","Automne":"🍂"}
 
 def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
-def to_paris(dt: datetime) -> datetime:
-    return dt.astimezone(PARIS_TZ)
-
-def apply_offset_utc(dt_utc: datetime, h: int, m: int) -> datetime:
-    return dt_utc + timedelta(hours=h, minutes=m)
-
 def mins_between(a: datetime, b: datetime) -> int:
     return max(1, int(round(abs((b - a).total_seconds()) / 60.0)))
 
@@ -84,152 +258,1058 @@ def fmt_rel_fr(now_dt: datetime, target_dt: datetime, future: bool) -> str:
     text = " ".join(parts)
     return f"dans {text}" if future else f"il y a {text}"
 
+def fmt_discord_ts(target_utc: datetime, style: str = "R") -> str:
+    """Horodatage natif Discord (<t:epoch:R>), rendu dans le fuseau du lecteur."""
+    return f"<t:{int(target_utc.timestamp())}:{style}>"
+
+def fmt_countdown(now_utc: datetime, target_utc: datetime) -> str:
+    """Compte à rebours selon TIMER_MODE (texte FR ou horodatage natif)."""
+    if NATIVE_TIMERS:
+        return f"{fmt_discord_ts(target_utc, 'R')} ({fmt_discord_ts(target_utc, 'f')})"
+    return fmt_rel_fr(now_utc, target_utc, future=True)  # un écart ne dépend pas du fuseau
+
+SEASONS = ["Hiver","Printemps","Été","Automne"]
+SEASON_START_DAYS = (1, 9, 16, 24)  # jour du mois où débute chaque saison de SEASONS
+
+def season_index(day: int) -> int:
+    return bisect.bisect_right(SEASON_START_DAYS, day) - 1
+
 def season_from_day(day: int) -> str:
-    if 1 <= day <= 8:   return "Hiver"
-    if 9 <= day <= 15:  return "Printemps"
-    if 16 <= day <= 23: return "Été"
-    return "Automne"
+    return SEASONS[season_index(day)]
 
 def next_season(season: str) -> str:
-    order = ["Hiver","Printemps","Été","Automne"]
-    return order[(order.index(season)+1)%4]
-
-def next_season_boundary_local(local_dt: datetime) -> datetime:
-    base = local_dt.replace(hour=0, minute=0, second=0, microsecond=0)
-    d = local_dt.day
-    if d <= 8:   return base.replace(day=9)
-    if d <= 15:  return base.replace(day=16)
-    if d <= 23:  return base.replace(day=24)
-    year  = base.year + (1 if base.month == 12 else 0)
-    month = 1 if base.month == 12 else base.month + 1
-    return base.replace(year=year, month=month, day=1)
+    return SEASONS[(SEASONS.index(season)+1)%4]
+
+# ──────────────── Horloges des continents ────────────────
+# Les minuits locaux des CLOCK_HORIZON_DAYS prochains jours sont calculés une
+# fois par continent, dans son fuseau (heure d’été comprise), avec la saison de
+# chaque jour et les débuts de saison. « Jour local, saison, prochaine échéance »
+# n’est plus qu’une bisection ; la table est refaite quand l’horizon est atteint.
+
+CLOCK_HORIZON_DAYS = max(40, _env_int("CLOCK_HORIZON_DAYS", 92))  # ≥ 40 : au moins un début de saison à venir
+
+class LocalDay(NamedTuple):
+    day: date                    # date locale
+    season: str
+    start_utc: datetime          # minuit local de ce jour
+    next_midnight_utc: datetime
+    next_season_utc: datetime    # prochain début de saison
+
+class ContinentClock:
+    """Table de transitions d’un fuseau : minuits locaux (UTC, triés) et débuts de saison."""
+
+    def __init__(self, zone, first: date, days: int):
+        self.zone      = zone
+        self.days      = [first + timedelta(days=k) for k in range(days + 1)]
+        # minuit inexistant (passage à l’heure d’été à 0 h) → instant du changement d’heure
+        self.midnights = [datetime(d.year, d.month, d.day, tzinfo=zone).astimezone(timezone.utc) for d in self.days]
+        self.seasons   = [season_from_day(d.day) for d in self.days]
+        self.season_starts = [m for d, m in zip(self.days, self.midnights) if d.day in SEASON_START_DAYS]
+
+    def covers(self, now_utc: datetime) -> bool:
+        return self.midnights[0] <= now_utc < self.season_starts[-1]
+
+    def at(self, now_utc: datetime) -> LocalDay:
+        i = bisect.bisect_right(self.midnights, now_utc) - 1
+        j = bisect.bisect_right(self.season_starts, now_utc)
+        return LocalDay(self.days[i], self.seasons[i], self.midnights[i], self.midnights[i + 1], self.season_starts[j])
+
+_CLOCKS: dict = {}  # continent -> ContinentClock (vidé quand la configuration climatique change)
+
+def continent_clock(cont: str, now_utc: datetime) -> ContinentClock:
+    clock = _CLOCKS.get(cont)
+    if clock is None or not clock.covers(now_utc):
+        zone  = CONTINENT_ZONES[cont]
+        first = now_utc.astimezone(zone).date() - timedelta(days=1)
+        clock = _CLOCKS[cont] = ContinentClock(zone, first, CLOCK_HORIZON_DAYS)
+    return clock
+
+def local_day(cont: str, now_utc: datetime) -> LocalDay:
+    return continent_clock(cont, now_utc).at(now_utc)
+
+def timers_header() -> str:
+    return "Horaires" if NATIVE_TIMERS else "Horaires (Europe/Paris)"
+
+def timers_footer(extra: str = "") -> str:
+    base = "Heures affichées dans votre fuseau" if NATIVE_TIMERS else "Heure affichée : Europe/Paris"
+    return f"{base} • {extra}" if extra else base
+
+def stamp_embed(emb: "discord.Embed", now_utc: datetime, content_since_utc: datetime):
+    # En mode natif, l’horodatage est figé au début de la période affichée :
+    # l’embed reste identique d’un tick à l’autre (aucune réédition nécessaire).
+    emb.timestamp = content_since_utc if NATIVE_TIMERS else now_utc
 
 # ──────────────── Discord client ────────────────
 intents = discord.Intents.default()
-client  = discord.Client(intents=intents)
+# Au-delà de 30 s d’attente, discord.py lève RateLimited au lieu de dormir :
+# la file d’envoi (Dispatcher) recale alors son seau et replanifie.
+client  = (discord.AutoShardedClient if SHARDED else discord.Client)(intents=intents, max_ratelimit_timeout=30.0)
+tree    = app_commands.CommandTree(client)
+
+# ──────────────────────── PERSISTANCE ────────────────────────
+# Magasin d’état enfichable :
+#  - "sqlite" (défaut) : une ligne JSON par document, journal WAL
+#  - "json"            : un fichier par document, écriture atomique (tmp + rename)
+# Les sauvegardes sont regroupées (debounce) et écrites hors de la boucle asyncio.
+
+STATE_BACKEND    = os.getenv("STATE_BACKEND", "sqlite").strip().lower()
+STATE_DB         = os.getenv("STATE_DB", "bot_state.db")
+STATE_DEBOUNCE_S = 2.0
+
+# {channels:{"<guild>:<salon>": {messages:{continent:id}, last_sig:{continent:hash}}}}
+SEASON_STATE_FILE  = "season_state.json"
+# {channels:{"<guild>:<salon>": {messages:{continent:id}, last_sig:{}, last_date:{}}}}
+WEATHER_STATE_FILE = "meteo_daily_state.json"
+GUILD_CONFIG_FILE  = "guild_config.json"       # {"<guild_id>": {"saison": id, "meteo": id}}
+STATE_FILES = {"saisons": SEASON_STATE_FILE, "meteo": WEATHER_STATE_FILE, "guilds": GUILD_CONFIG_FILE}
+
+class StateStore(ABC):
+    """Stockage des documents d’état (JSON sérialisé) par nom."""
+
+    @abstractmethod
+    def load(self, name: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    def save(self, name: str, payload: str):
+        ...
+
+    def close(self):
+        pass
+
+class JsonStateStore(StateStore):
+    def __init__(self, files: dict):
+        self.files = files
+
+    def load(self, name: str) -> Optional[dict]:
+        path = self.files[name]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            # on garde la pièce à conviction au lieu de tout réinitialiser en silence
+            backup = f"{path}.corrupt-{int(time.time())}"
+            os.replace(path, backup)
+            log_state.error("état illisible → mis de côté, repart à vide", extra=kv(doc=name, backup=backup, err=e))
+            return None
 
-# ──────────────────────── SAISONS ────────────────────────
+    def save(self, name: str, payload: str):
+        path = self.files[name]
+        tmp  = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+class SqliteStateStore(StateStore):
+    def __init__(self, path: str, legacy_files: dict):
+        self.legacy = JsonStateStore(legacy_files)
+        self._lock  = threading.Lock()
+        self._db    = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS state (name TEXT PRIMARY KEY, data TEXT NOT NULL, updated REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def load(self, name: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute("SELECT data FROM state WHERE name = ?", (name,)).fetchone()
+        if row is not None:
+            return json.loads(row[0])
+        # migration automatique depuis l’ancien fichier JSON
+        data = self.legacy.load(name) if name in self.legacy.files else None
+        if data is not None:
+            self.save(name, json.dumps(data, ensure_ascii=False))
+            path = self.legacy.files[name]
+            os.replace(path, f"{path}.migrated")
+            log_state.info("ancien fichier JSON migré", extra=kv(src=path, db=STATE_DB))
+        return data
+
+    def save(self, name: str, payload: str):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO state (name, data, updated) VALUES (?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET data = excluded.data, updated = excluded.updated",
+                (name, payload, time.time()),
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+class StateSaver:
+    """Regroupe les sauvegardes : une écriture par document toutes les STATE_DEBOUNCE_S au plus."""
+
+    def __init__(self, store: StateStore):
+        self.store  = store
+        self._dirty = {}  # name -> dict (référence vivante)
+        self._task  = None
+
+    def mark(self, name: str, data: dict):
+        self._dirty[name] = data
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush_sync()
+            return
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        # un mark() pendant l’écriture ne relance pas de tâche (celle-ci n’est pas finie) :
+        # on reboucle tant qu’il reste des documents sales
+        while self._dirty:
+            await asyncio.sleep(STATE_DEBOUNCE_S)
+            await self.flush()
+
+    def _snapshot(self) -> dict:
+        # sérialisé dans la boucle : instantané cohérent, aucune mutation concurrente
+        dirty, self._dirty = self._dirty, {}
+        return {name: json.dumps(data, ensure_ascii=False, separators=(",", ":")) for name, data in dirty.items()}
+
+    def _write(self, snap: dict) -> list:
+        """Exécuté hors boucle : retourne les durées, enregistrées ensuite par l’appelant."""
+        durations = []
+        for name, payload in snap.items():
+            t0 = time.perf_counter()
+            try:
+                self.store.save(name, payload)
+            except Exception as e:
+                log_state.error("échec de sauvegarde", extra=kv(doc=name, err=e))
+            durations.append((name, time.perf_counter() - t0))
+        return durations
 
-SEASON_STATE_FILE = "season_state.json"  # {messages:{continent:id}, last_sig:{continent:hash}}
+    @staticmethod
+    def _record(durations: list):
+        # dans la boucle : Metrics n’est pas protégé contre un render() concurrent
+        for name, seconds in durations:
+            metrics.observe("botrp_state_save_seconds", seconds, doc=name)
 
-def season_state_load():
-    try:
-        with open(SEASON_STATE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return {"messages":{}, "last_sig":{}}
+    async def flush(self):
+        snap = self._snapshot()
+        if snap:
+            self._record(await asyncio.get_running_loop().run_in_executor(None, self._write, snap))
 
-def season_state_save(st):
+    def flush_sync(self):
+        self._record(self._write(self._snapshot()))
+
+def make_state_store() -> StateStore:
+    if STATE_BACKEND == "json":
+        return JsonStateStore(STATE_FILES)
+    return SqliteStateStore(STATE_DB, STATE_FILES)
+
+state_store = make_state_store()
+state_saver = StateSaver(state_store)
+
+def load_state(name: str, default: dict) -> dict:
     try:
-        with open(SEASON_STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(st, f, ensure_ascii=False, indent=2)
+        st = state_store.load(name)
     except Exception as e:
-        print("⚠️ save season:", e)
+        log_state.error("échec de chargement", extra=kv(doc=name, err=e))
+        st = None
+    st = st if isinstance(st, dict) else {}
+    for k, v in default.items():
+        st.setdefault(k, v)
+    return st
+
+# ──────────────────────── CACHE DE RENDU ────────────────────────
+# Les embeds ne dépendent que de (continent, date locale, saison) — et de la
+# minute courante en TIMER_MODE=fr. On les calcule une fois par clé, quel que
+# soit le nombre de salons abonnés ou de commandes.
+
+RENDER_CACHE_SIZE = _env_int("RENDER_CACHE_SIZE", 256)
+
+class RenderCache:
+    """LRU borné : clé → (embed, signature, date_locale)."""
+
+    def __init__(self, maxsize: int = RENDER_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._data   = OrderedDict()
+        self.hits    = 0
+        self.misses  = 0
+
+    def get_or_render(self, key: tuple, render):
+        item = self._data.get(key)
+        if item is not None:
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item
+        self.misses += 1
+        item = self._data[key] = render()
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return item
+
+    def invalidate(self, continent: Optional[str] = None, kind: Optional[str] = None):
+        """Purge explicite (bascule de saison / minuit local) ; tout si aucun filtre."""
+        for key in [k for k in self._data if (kind is None or k[0] == kind) and (continent is None or k[1] == continent)]:
+            del self._data[key]
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
+
+render_cache = RenderCache()
+
+@metrics.collector
+def _render_cache_metrics(m: Metrics):
+    m.set("botrp_render_cache_total", render_cache.hits,   result="hit")
+    m.set("botrp_render_cache_total", render_cache.misses, result="miss")
+
+def render_key(kind: str, continent: str, now_utc: datetime) -> tuple:
+    today  = local_day(continent, now_utc)
+    bucket = None if NATIVE_TIMERS else now_utc.replace(second=0, microsecond=0)
+    return (kind, continent, today.day, today.season, bucket)
+
+# ──────────────────────── SAISONS ────────────────────────
+
+def season_state_load():
+    return load_state("saisons", {"channels":{}})
+
+def season_state_save(st):
+    state_saver.mark("saisons", st)
+
+def season_state_save_all():
+    season_state_save(season_state)
 
 season_state = season_state_load()
 
 def season_embed(continent: str, now_utc: datetime):
-    h_off, m_off = CONTINENT_OFFSETS[continent]
-    local_dt     = apply_offset_utc(now_utc, h_off, m_off)
-    season       = season_from_day(local_dt.day)
+    today  = local_day(continent, now_utc)
+    season = today.season
 
     title = f"{continent} — Saison actuelle"
     desc  = f"{SEASON_EMOJI[season]} **{season}**\n"
-    desc += f"_Date locale de référence :_ **{local_dt.strftime('%d %b %Y')}**"
-
-    next_local   = next_season_boundary_local(local_dt)
-    next_utc     = (next_local - timedelta(hours=h_off, minutes=m_off)).replace(tzinfo=timezone.utc)
-    now_paris    = to_paris(now_utc)
-    next_paris   = to_paris(next_utc)
+    desc += f"_Date locale de référence :_ **{today.day.strftime('%d %b %Y')}**"
 
     desc += (
-        f"\n\n**Horaires (Europe/Paris)**\n"
-        f"• Prochaine Saison : {fmt_rel_fr(now_paris, next_paris, future=True)}\n"
+        f"\n\n**{timers_header()}**\n"
+        f"• Prochaine Saison : {fmt_countdown(now_utc, today.next_season_utc)}\n"
     )
 
     emb = discord.Embed(title=title, description=desc, color=discord.Color.orange())
-    emb.timestamp = now_paris  # footer "Aujourd’hui à …" (heure Paris)
-    emb.set_footer(text="Heure affichée : Europe/Paris")
-    return emb, season, local_dt
+    stamp_embed(emb, now_utc, today.start_utc)
+    emb.set_footer(text=timers_footer())
+    return emb, season, today.day
 
-def season_signature(cont: str, season: str, local_dt: datetime) -> str:
-    payload = f"{cont}|{season}|{local_dt.strftime('%Y-%m-%d')}"
+def season_signature(cont: str, season: str, day: date) -> str:
+    payload = f"{RENDER_TAG}|{cont}|{season}|{day.strftime('%Y-%m-%d')}"
     return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
+def render_season(continent: str, now_utc: datetime):
+    """(embed, signature, date_locale) depuis le cache de rendu."""
+    def _render():
+        emb, season, day = season_embed(continent, now_utc)
+        return emb, season_signature(continent, season, day), day
+    return render_cache.get_or_render(render_key("saison", continent, now_utc), _render)
+
 # Helper: récupère un salon texte + logs
+_CHANNELS: dict = {}     # chan_id -> TextChannel résolu (mémoïsé, logué une seule fois)
+_MSG_HANDLES: dict = {}  # msg_id -> discord.PartialMessage (édition sans fetch_message)
+_CHANNEL_FETCHES: dict = {}  # chan_id -> résolution en cours (passes de démarrage concurrentes)
+_CHANNEL_FAILED: dict = {}   # chan_id -> _loop_time() d’un échec définitif (NotFound, Forbidden, type)
+CHANNEL_RETRY_S = 3600       # salon introuvable/inaccessible : nouvel essai au plus tôt dans 1 h
+
 async def _get_text_channel(chan_id: int, label: str):
     if not chan_id:
-        print(f"[DIAG] {label}: ID manquant (0).")
+        log_diag.warning("ID de salon manquant (0)", extra=kv(panel=label))
         return None
+    ch = _CHANNELS.get(chan_id)
+    if ch is not None:
+        return ch
+    failed = _CHANNEL_FAILED.get(chan_id)
+    if failed is not None and _loop_time() - failed < CHANNEL_RETRY_S:
+        return None  # déjà logué : pas de fetch à chaque tick
+    return await _single_flight(_CHANNEL_FETCHES, chan_id, lambda: _resolve_text_channel(chan_id, label))
+
+async def _single_flight(inflight: dict, key, start):
+    """Les appelants concurrents d’une même clé partagent une seule exécution de start()."""
+    pending = inflight.get(key)
+    if pending is None:
+        pending = inflight[key] = asyncio.ensure_future(start())
+        pending.add_done_callback(lambda _: inflight.pop(key, None))
+    return await asyncio.shield(pending)
+
+def _channel_failed(chan_id: int, msg: str, **fields):
+    """Échec définitif : logué en ERROR la première fois, puis en DEBUG à chaque nouvel essai."""
+    first = chan_id not in _CHANNEL_FAILED
+    _CHANNEL_FAILED[chan_id] = _loop_time()
+    (log_diag.error if first else log_diag.debug)(msg, extra=kv(chan=chan_id, **fields))
+
+async def _resolve_text_channel(chan_id: int, label: str):
     ch = client.get_channel(chan_id)
     if ch is None:
         try:
             ch = await client.fetch_channel(chan_id)
         except discord.Forbidden:
-            print(f"[DIAG] {label}: Forbidden (pas la permission de voir le salon {chan_id}).")
+            _channel_failed(chan_id, "Forbidden : pas la permission de voir le salon", panel=label)
             return None
         except discord.NotFound:
-            print(f"[DIAG] {label}: NotFound (ID {chan_id} introuvable).")
+            _channel_failed(chan_id, "NotFound : salon introuvable", panel=label)
             return None
         except Exception as e:
-            print(f"[DIAG] {label}: fetch_channel({chan_id}) a échoué: {e}")
+            log_diag.error("fetch_channel a échoué", extra=kv(panel=label, chan=chan_id, err=e))
             return None
     if not isinstance(ch, discord.TextChannel):
-        print(f"[DIAG] {label}: type non supporté ({type(ch)}). Donne un salon TEXTE.")
+        _channel_failed(chan_id, "type de salon non supporté (donne un salon TEXTE)", panel=label, type=type(ch).__name__)
         return None
-    print(f"[DIAG] {label}: OK → {ch} (guild={getattr(ch.guild,'name','?')})")
+    log_diag.info("salon OK", extra=kv(panel=label, chan=f"#{ch}", guild=getattr(ch.guild, "name", "?")))
+    _CHANNEL_FAILED.pop(chan_id, None)
+    _CHANNELS[chan_id] = ch
     return ch
 
-async def seasons_ensure_messages():
-    ch = await _get_text_channel(CHANNEL_SAISON, "SAISON")
-    if ch is None:
-        return
+def forget_channel(chan_id: int):
+    _CHANNELS.pop(chan_id, None)
+    _CHANNEL_FAILED.pop(chan_id, None)
+    _WEBHOOKS.pop(chan_id, None)
+    _WEBHOOK_DENIED.pop(chan_id, None)
 
-    now = utc_now()
-    for cont in CONTINENT_OFFSETS.keys():
+def message_handle(ch, msg_id: int) -> "discord.PartialMessage":
+    h = _MSG_HANDLES.get(msg_id)
+    if h is None:
+        h = _MSG_HANDLES[msg_id] = ch.get_partial_message(msg_id)
+    return h
+
+def forget_message(msg_id: int):
+    _MSG_HANDLES.pop(msg_id, None)
+
+async def timed_rest(route: str, coro):
+    """Attend une requête REST en mesurant latence et statut (métriques par route)."""
+    t0, status = time.perf_counter(), "200"
+    try:
+        return await coro
+    except discord.RateLimited:
+        status = "429"
+        raise
+    except discord.HTTPException as e:
+        status = str(e.status)
+        raise
+    except Exception:
+        status = "error"
+        raise
+    finally:
+        metrics.observe("botrp_rest_latency_seconds", time.perf_counter() - t0, route=route)
+        metrics.inc("botrp_rest_requests_total", route=route, status=status)
+
+# ──────────────── Émetteurs : bot ou webhook ────────────────
+# PUBLISH_MODE=webhook : chaque salon de panneau reçoit un webhook (créé ou
+# réutilisé) dont les requêtes passent par une session aiohttp partagée, hors
+# du rate-limit global du bot. Sans « Gérer les webhooks », repli sur le bot.
+# Un message ne peut être édité que par son auteur : l’état de chaque salon
+# retient l’émetteur ("via") et un changement d’émetteur republie les messages.
+
+PUBLISH_MODE       = os.getenv("PUBLISH_MODE", "bot").strip().lower()
+WEBHOOKS_ENABLED   = PUBLISH_MODE == "webhook"
+WEBHOOK_NAME       = "Saisons & Météo"
+WEBHOOK_RETRY_S    = 6 * 3600  # après un refus de permission, nouvel essai au plus tôt dans 6 h
+WEBHOOK_POOL_SIZE  = _env_int("WEBHOOK_POOL_SIZE", 20)
+UNKNOWN_WEBHOOK    = 10015  # code d’erreur Discord : webhook supprimé
+
+_HTTP_SESSION = None       # aiohttp.ClientSession partagée par tous les webhooks
+_WEBHOOKS: dict = {}       # chan_id -> discord.Webhook
+_WEBHOOK_DENIED: dict = {} # chan_id -> _loop_time() du refus
+_WEBHOOK_FETCHES: dict = {}
+
+class BotPublisher:
+    via = "bot"
+
+    def __init__(self, ch):
+        self.ch = ch
+
+    async def send(self, embeds: list) -> int:
+        return (await timed_rest("POST message", self.ch.send(embeds=embeds))).id
+
+    async def edit(self, msg_id: int, embeds: list):
+        # PartialMessage mémoïsé : pas de fetch_message préalable
+        await timed_rest("PATCH message", message_handle(self.ch, msg_id).edit(embeds=embeds))
+
+    async def delete(self, msg_id: int):
+        await timed_rest("DELETE message", self.ch.get_partial_message(msg_id).delete())
+
+class WebhookPublisher:
+    def __init__(self, ch, webhook):
+        self.ch      = ch
+        self.webhook = webhook
+        self.via     = f"webhook:{webhook.id}"
+
+    async def _call(self, route: str, coro):
         try:
-            emb, season, local_dt = season_embed(cont, now)
-            sig = season_signature(cont, season, local_dt)
+            return await timed_rest(route, coro)
+        except discord.NotFound as e:
+            if e.code == UNKNOWN_WEBHOOK:
+                forget_webhook(self.ch.id)  # le prochain passage en crée un autre
+            raise
+
+    async def send(self, embeds: list) -> int:
+        return (await self._call("POST webhook", self.webhook.send(embeds=embeds, wait=True))).id
 
-            msg_id = season_state["messages"].get(cont)
-            last   = season_state["last_sig"].get(cont)
+    async def edit(self, msg_id: int, embeds: list):
+        await self._call("PATCH webhook", self.webhook.edit_message(msg_id, embeds=embeds))
 
-            if msg_id:
+    async def delete(self, msg_id: int):
+        await self._call("DELETE webhook", self.webhook.delete_message(msg_id))
+
+def webhook_session():
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None or _HTTP_SESSION.closed:
+        import aiohttp
+        _HTTP_SESSION = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=WEBHOOK_POOL_SIZE),
+                                              timeout=aiohttp.ClientTimeout(total=30))
+    return _HTTP_SESSION
+
+async def close_webhook_session():
+    if _HTTP_SESSION is not None and not _HTTP_SESSION.closed:
+        await _HTTP_SESSION.close()
+
+def bind_webhook(hook) -> "discord.Webhook":
+    """Webhook partiel (id + token) sur la session partagée."""
+    return discord.Webhook.partial(hook.id, hook.token, session=webhook_session())
+
+def forget_webhook(chan_id: int):
+    _WEBHOOKS.pop(chan_id, None)
+
+async def _resolve_webhook(ch):
+    try:
+        hooks = await timed_rest("GET webhooks", ch.webhooks())
+        me    = getattr(client.user, "id", None)
+        hook  = next((h for h in hooks if h.token and h.name == WEBHOOK_NAME and getattr(h.user, "id", None) == me), None)
+        if hook is None:
+            hook = await timed_rest("POST webhook", ch.create_webhook(name=WEBHOOK_NAME, reason="Panneaux saisons / météo"))
+            log_panel.info("webhook créé", extra=kv(chan=chan_key(ch), webhook=hook.id))
+    except discord.HTTPException as e:
+        if isinstance(e, discord.Forbidden):
+            reason = "permission « Gérer les webhooks » manquante"
+        elif 400 <= e.status < 500 and e.status != 429:
+            reason = "webhook refusé (ex. 30007 : trop de webhooks dans le salon)"
+        else:
+            # 5xx / 429 : passager, pas de repli sur le bot (il republierait tout) ; salon sauté ce passage
+            raise
+        first = ch.id not in _WEBHOOK_DENIED
+        _WEBHOOK_DENIED[ch.id] = _loop_time()
+        (log_panel.warning if first else log_panel.debug)(
+            f"{reason} → publication par le bot", extra=kv(chan=chan_key(ch), code=e.code, status=e.status))
+        return None
+    _WEBHOOK_DENIED.pop(ch.id, None)
+    wh = _WEBHOOKS[ch.id] = bind_webhook(hook)
+    return wh
+
+async def publisher_for(ch):
+    """
+    Émetteur à utiliser pour un salon (webhook si activé et autorisé, sinon bot).
+    Seul un refus de permission fait retomber sur le bot ; toute autre erreur remonte.
+    """
+    if not WEBHOOKS_ENABLED:
+        return BotPublisher(ch)
+    wh = _WEBHOOKS.get(ch.id)
+    if wh is None:
+        denied = _WEBHOOK_DENIED.get(ch.id)
+        if denied is not None and _loop_time() - denied < WEBHOOK_RETRY_S:
+            return BotPublisher(ch)
+        wh = await _single_flight(_WEBHOOK_FETCHES, ch.id, lambda: _resolve_webhook(ch))
+    return WebhookPublisher(ch, wh) if wh is not None else BotPublisher(ch)
+
+async def publisher_from_via(ch, via: str):
+    """
+    Émetteur capable de supprimer les anciens messages d’un salon : le webhook
+    d’origine, retrouvé par son id (y compris après un redémarrage), sinon le bot
+    (webhook supprimé ou illisible : « Gérer les messages » suffit à supprimer).
+    """
+    if not via.startswith("webhook:"):
+        return BotPublisher(ch)
+    wh = _WEBHOOKS.get(ch.id)
+    if wh is not None and via == f"webhook:{wh.id}":
+        return WebhookPublisher(ch, wh)
+    try:
+        hooks = await timed_rest("GET webhooks", ch.webhooks())
+    except discord.Forbidden:
+        return BotPublisher(ch)
+    hook = next((h for h in hooks if f"webhook:{h.id}" == via and h.token), None)
+    return WebhookPublisher(ch, bind_webhook(hook)) if hook is not None else BotPublisher(ch)
+
+async def edit_or_recreate(pub, msg_id: Optional[int], embeds: list) -> tuple:
+    """
+    Édite directement le message ; NotFound → nouveau message.
+    Retourne (id, créé). Forbidden (et webhook supprimé) remontent à l’appelant.
+    """
+    if msg_id:
+        try:
+            await pub.edit(msg_id, embeds)
+            return msg_id, False
+        except discord.NotFound as e:
+            if e.code == UNKNOWN_WEBHOOK:
+                raise
+            forget_message(msg_id)
+    return await pub.send(embeds), True
+
+# ──────────────── File d’envoi (anti rate-limit) ────────────────
+# Toutes les écritures (send/edit/delete) des panneaux passent par ici :
+#  - un worker par salon (les salons indépendants avancent en parallèle)
+#  - un seau par route (salon), recalé sur les 429 de Discord (Retry-After)
+#  - coalescence : une écriture non encore partie est remplacée par la plus
+#    récente pour le même emplacement (last write wins)
+#  - priorités : changement de contenu avant simple rafraîchissement
+
+PRIO_CONTENT = 0
+PRIO_REFRESH = 1
+
+# Limite documentée des messages par salon : 5 requêtes / 5 s
+BUCKET_LIMIT = _env_int("BUCKET_LIMIT", 5)
+BUCKET_PER_S = 5.0
+
+def _loop_time() -> float:
+    # horloge monotone de la boucle asyncio (virtualisable par bench.py)
+    return asyncio.get_running_loop().time()
+
+class RouteBucket:
+    def __init__(self, limit: int = BUCKET_LIMIT, per: float = BUCKET_PER_S):
+        self.limit     = limit
+        self.per       = per
+        self.remaining = limit
+        self.reset_at  = 0.0  # horloge de la boucle (loop.time())
+
+    async def acquire(self):
+        while True:
+            now = _loop_time()
+            if now >= self.reset_at:
+                self.remaining = self.limit
+                self.reset_at  = now + self.per
+            if self.remaining > 0:
+                self.remaining -= 1
+                return
+            metrics.inc("botrp_ratelimit_wait_seconds_total", self.reset_at - now)
+            await asyncio.sleep(self.reset_at - now)
+
+    def penalize(self, retry_after: float):
+        metrics.inc("botrp_ratelimited_total")
+        self.remaining = 0
+        self.reset_at  = _loop_time() + max(0.0, retry_after)
+
+class _Job:
+    __slots__ = ("key", "op", "prio", "seq", "future")
+
+    def __init__(self, key, op, prio: int, seq: int):
+        self.key, self.op, self.prio, self.seq = key, op, prio, seq
+        self.future = asyncio.get_running_loop().create_future()
+
+class Dispatcher:
+    MAX_RETRIES = 5
+
+    def __init__(self):
+        self._pending = {}  # key -> _Job (pas encore parti)
+        self._queues  = {}  # chan_id -> tas [(prio, seq, key)]
+        self._workers = {}  # chan_id -> asyncio.Task
+        self._buckets = {}  # chan_id -> RouteBucket
+        self._seq = 0
+
+    def bucket(self, chan_id: int) -> RouteBucket:
+        b = self._buckets.get(chan_id)
+        if b is None:
+            b = self._buckets[chan_id] = RouteBucket()
+        return b
+
+    def submit(self, chan_id: int, key, op, prio: int = PRIO_CONTENT) -> "asyncio.Future":
+        """op : fabrique de coroutine (sans argument). Retourne un Future du résultat."""
+        self._seq += 1
+        job = self._pending.get(key)
+        if job is not None:
+            job.op = op  # last write wins
+            if prio >= job.prio:
+                return job.future
+            job.prio, job.seq = prio, self._seq  # promu : l’ancienne entrée du tas devient obsolète
+        else:
+            job = self._pending[key] = _Job(key, op, prio, self._seq)
+        heapq.heappush(self._queues.setdefault(chan_id, []), (job.prio, job.seq, key))
+        if chan_id not in self._workers:
+            self._workers[chan_id] = asyncio.create_task(self._worker(chan_id))
+        return job.future
+
+    def submit_embeds(self, pub, slot, msg_id: Optional[int], embeds: list, prio: int = PRIO_CONTENT):
+        chan_id = pub.ch.id
+        return self.submit(chan_id, ("embeds", chan_id, slot), lambda: edit_or_recreate(pub, msg_id, embeds), prio)
+
+    async def _worker(self, chan_id: int):
+        queue, bucket = self._queues[chan_id], self.bucket(chan_id)
+        retries = {}
+        try:
+            while queue:
+                prio, seq, key = heapq.heappop(queue)
+                job = self._pending.get(key)
+                if job is None or job.seq != seq:
+                    continue  # entrée obsolète (remplacée/promue)
+                await bucket.acquire()
+                del self._pending[key]
                 try:
-                    msg = await ch.fetch_message(msg_id)
-                    await msg.edit(embed=emb)  # rafraîchit les timers à chaque tick
-                    if last != sig:
-                        print(f"[SAISON] {cont}: contenu changé → signature maj.")
-                        season_state["last_sig"][cont] = sig
+                    _settle(job.future, await job.op())
+                except discord.RateLimited as e:
+                    bucket.penalize(e.retry_after)
+                    self._retry(chan_id, job, retries)
+                except discord.HTTPException as e:
+                    if e.status == 429 and retries.get(key, 0) < self.MAX_RETRIES:
+                        headers = getattr(e.response, "headers", {}) or {}
+                        bucket.penalize(float(headers.get("Retry-After", BUCKET_PER_S)))
+                        self._retry(chan_id, job, retries)
                     else:
-                        print(f"[SAISON] {cont}: timers rafraîchis (pas de changement).")
-                except discord.NotFound:
-                    print(f"[SAISON] {cont}: ancien message introuvable → recréation.")
-                    new = await ch.send(embed=emb)
-                    season_state["messages"][cont] = new.id
-                    season_state["last_sig"][cont]  = sig
-                except discord.Forbidden:
-                    print(f"[SAISON] {cont}: Forbidden (pas la permission d’éditer/écrire dans #{ch}).")
-                    return
-            else:
-                new = await ch.send(embed=emb)
-                season_state["messages"][cont] = new.id
-                season_state["last_sig"][cont]  = sig
-                print(f"[SAISON] {cont}: message créé (id={new.id}).")
+                        _settle(job.future, exc=e)
+                except Exception as e:
+                    _settle(job.future, exc=e)
+        finally:
+            self._workers.pop(chan_id, None)
+
+    def _retry(self, chan_id: int, job: _Job, retries: dict):
+        retries[job.key] = retries.get(job.key, 0) + 1
+        if retries[job.key] > self.MAX_RETRIES:
+            _settle(job.future, exc=RuntimeError(f"rate-limit persistant sur {job.key}"))
+            return
+        newer = self._pending.get(job.key)
+        if newer is not None:
+            # une écriture plus récente attend déjà : elle remplace celle-ci
+            newer.future.add_done_callback(lambda f, old=job.future: _chain_future(f, old))
+            return
+        self._pending[job.key] = job
+        heapq.heappush(self._queues[chan_id], (job.prio, job.seq, job.key))
+
+def _settle(fut: "asyncio.Future", result=None, exc: Optional[BaseException] = None):
+    """Un demandeur annulé annule aussi le Future partagé : le worker ne doit pas en mourir."""
+    if fut.done():
+        return
+    if exc is not None:
+        fut.set_exception(exc)
+    else:
+        fut.set_result(result)
+
+def _chain_future(src: "asyncio.Future", dst: "asyncio.Future"):
+    if dst.done():
+        return
+    if src.cancelled():
+        dst.cancel()
+    elif src.exception() is not None:
+        dst.set_exception(src.exception())
+    else:
+        dst.set_result(src.result())
+
+dispatcher = Dispatcher()
+
+# ──────────────── Abonnements multi-serveurs ────────────────
+# Chaque serveur peut déclarer ses salons de panneaux (/panneaux définir) ;
+# CHANNEL_SAISON / CHANNEL_METEO restent un abonnement implicite.
+# L’état des messages est rangé par salon : st["channels"]["<guild>:<salon>"][…][continent].
+
+PANEL_KINDS = {"saison": "SAISON", "meteo": "METEO"}
+
+guild_config = load_state("guilds", {})  # {"<guild_id>": {"saison": chan_id, "meteo": chan_id}}
+
+def guild_config_save():
+    state_saver.mark("guilds", guild_config)
+
+def set_guild_channel(guild_id: int, kind: str, chan_id: Optional[int]):
+    cfg = guild_config.setdefault(str(guild_id), {})
+    if chan_id:
+        cfg[kind] = chan_id
+    else:
+        cfg.pop(kind, None)
+    if not cfg:
+        guild_config.pop(str(guild_id), None)
+    guild_config_save()
+
+def _env_channel(kind: str) -> int:
+    return CHANNEL_SAISON if kind == "saison" else CHANNEL_METEO
+
+async def subscribed_channels(kind: str) -> list:
+    ids = [_env_channel(kind)] if _env_channel(kind) else []
+    for cfg in guild_config.values():
+        cid = cfg.get(kind)
+        if cid and cid not in ids:
+            ids.append(cid)
+    chans = []
+    for cid in ids:
+        ch = await _get_text_channel(cid, PANEL_KINDS[kind])
+        if ch is not None:
+            chans.append(ch)
+    return chans
+
+def chan_key(ch) -> str:
+    return f"{ch.guild.id}:{ch.id}"
+
+def channel_state(st: dict, ch, kind: str) -> dict:
+    """État (messages, signatures…) d’un salon ; adopte l’ancien état mono-salon si besoin."""
+    key = chan_key(ch)
+    cst = st["channels"].get(key)
+    if cst is None:
+        cst = st["channels"][key] = {}
+        if ch.id == _env_channel(kind):
+            # migration : l’état à plat d’avant appartient au salon de la variable d’env
+            for k in [k for k in st if k != "channels"]:
+                cst[k] = st.pop(k)
+            if cst:
+                rebuild_message_index()  # l’index de démarrage ne voyait pas l’état à plat
+    cst.setdefault("messages", {})
+    cst.setdefault("last_sig", {})
+    return cst
+
+# ──────────────── Index des messages suivis ────────────────
+# msg_id → (type, "<guild>:<salon>", continent | "panel"), reconstruit depuis l’état.
+# Les événements gateway de suppression y sont confrontés : un panneau supprimé
+# est recréé aussitôt, sans sonder l’existence des messages à chaque tick.
+
+_TRACKED: dict = {}
+
+def track_message(msg_id: int, kind: str, key: str, slot: str):
+    _TRACKED[msg_id] = (kind, key, slot)
+
+def untrack_message(msg_id: int):
+    _TRACKED.pop(msg_id, None)
+
+def _panel_state(kind: str) -> dict:
+    return season_state if kind == "saison" else weather_state
+
+def rebuild_message_index():
+    _TRACKED.clear()
+    for kind in PANEL_KINDS:
+        for key, cst in _panel_state(kind)["channels"].items():
+            for cont, msg_id in cst.get("messages", {}).items():
+                track_message(msg_id, kind, key, cont)
+            if cst.get("panel"):
+                track_message(cst["panel"], kind, key, "panel")
+
+def on_tracked_messages_deleted(msg_ids):
+    """Retire les messages supprimés de l’état et planifie leur recréation immédiate."""
+    now = utc_now()
+    for msg_id in msg_ids:
+        entry = _TRACKED.pop(msg_id, None)
+        if entry is None:
+            continue
+        kind, key, slot = entry
+        forget_message(msg_id)
+        cst = _panel_state(kind)["channels"].get(key)
+        if cst is not None:
+            if slot == "panel" and cst.get("panel") == msg_id:
+                cst.pop("panel", None)
+                cst.pop("panel_sig", None)
+            elif cst.get("messages", {}).get(slot) == msg_id:
+                del cst["messages"][slot]
+            (season_state_save_all if kind == "saison" else weather_state_save_all)()
+        log_panel.warning("message suivi supprimé → recréation immédiate", extra=kv(panel=PANEL_KINDS[kind], chan=key, slot=slot, id=msg_id))
+        metrics.inc("botrp_tracked_deleted_total", kind=kind)
+        if slot == "panel":
+            scheduler.trigger(kind, now)
+        else:
+            scheduler.push(now, kind, slot)
+
+# ──────────────── Publication des panneaux ────────────────
+
+MAX_EMBEDS_PER_MESSAGE = 10  # limite Discord
+
+def panel_signature(sigs: list) -> str:
+    return hashlib.sha256("|".join(sigs).encode("utf-8")).hexdigest()
+
+async def _delete_quietly(pub, msg_id: int):
+    untrack_message(msg_id)  # notre propre suppression ne doit pas déclencher de recréation
+    forget_message(msg_id)
+    try:
+        await dispatcher.submit(pub.ch.id, ("delete", msg_id), lambda: pub.delete(msg_id))
+    except (discord.NotFound, discord.Forbidden):
+        pass
+    except Exception as e:
+        log_panel.warning("échec de suppression", extra=kv(id=msg_id, err=e))
 
-            season_state_save(season_state)
-            await asyncio.sleep(1)  # anti-rafale
+async def ensure_combined_panel(pub, st: dict, kind: str, label: str, renders: dict, save, track_date: bool = False) -> bool:
+    """
+    Publie/rafraîchit un message unique portant tous les embeds d’un salon.
+    Migration : si l’état contient encore des messages par continent, le premier
+    est réutilisé comme panneau et les autres sont supprimés.
+    Retourne False si le salon est inaccessible (Forbidden).
+    """
+    ch     = pub.ch
+    conts  = list(renders.keys())[:MAX_EMBEDS_PER_MESSAGE]
+    embeds = [renders[c][0] for c in conts]
+    sigs   = {c: renders[c][1] for c in conts}
+    sig    = panel_signature([sigs[c] for c in conts])
+    msg_id = st.get("panel")
+    legacy = [st["messages"][c] for c in conts if st["messages"].get(c)]
+
+    if msg_id is None and legacy:
+        msg_id = legacy[0]
+        log_panel.info("migration → panneau combiné", extra=kv(panel=label, id=msg_id))
+
+    if msg_id and not legacy and NATIVE_TIMERS and st.get("panel_sig") == sig:
+        track_message(msg_id, kind, chan_key(ch), "panel")
+        metrics.inc("botrp_panel_updates_total", kind=kind, result="skipped")
+        return True  # rien de neuf
+
+    prio = PRIO_REFRESH if (msg_id and st.get("panel_sig") == sig) else PRIO_CONTENT
+    try:
+        new_id, created = await dispatcher.submit_embeds(pub, (label, "panel"), msg_id, embeds, prio)
+        if created:
+            log_panel.info("panneau introuvable → recréation" if msg_id else "panneau créé", extra=kv(panel=label, id=new_id))
+        metrics.inc("botrp_panel_updates_total", kind=kind, result="created" if created else "edited")
+    except discord.Forbidden:
+        log_panel.error("Forbidden : pas la permission d’éditer/écrire", extra=kv(panel=label))
+        metrics.inc("botrp_panel_updates_total", kind=kind, result="failed")
+        return False
+
+    for old in legacy:
+        if old != new_id:
+            await _delete_quietly(pub, old)
+    if st.get("panel_sig") != sig:
+        log_panel.info("panneau : contenu changé → signature maj.", extra=kv(panel=label))
+    elif not legacy and new_id == msg_id:
+        log_panel.debug("panneau : timers rafraîchis (pas de changement)", extra=kv(panel=label))
+        return True  # état inchangé : pas de sauvegarde
+    msg_id = new_id
+    st["messages"] = {}
+    st["panel"]     = msg_id
+    track_message(msg_id, kind, chan_key(ch), "panel")
+    st["panel_sig"] = sig
+    st["last_sig"].update(sigs)
+    if track_date:
+        st.setdefault("last_date", {}).update({c: renders[c][2].strftime("%Y%m%d") for c in conts})
+    save()
+    return True
+
+async def drop_combined_panel(pub, st: dict, label: str, save):
+    """Retour en disposition "split" : supprime l’ancien panneau combiné."""
+    msg_id = st.pop("panel", None)
+    st.pop("panel_sig", None)
+    if msg_id:
+        log_panel.info("retour en messages séparés → suppression du panneau", extra=kv(panel=label, id=msg_id))
+        await _delete_quietly(pub, msg_id)
+        st["last_sig"] = {}
+        save()
+
+async def ensure_split_messages(pub, st: dict, kind: str, label: str, renders: dict, save, track_date: bool = False):
+    """Un message par continent ; seuls les continents présents dans renders sont traités."""
+    ch   = pub.ch
+    jobs = {}
+    for cont, (emb, sig, local) in renders.items():
+        msg_id = st["messages"].get(cont)
+        last   = st["last_sig"].get(cont)
+
+        if msg_id and NATIVE_TIMERS and last == sig:
+            track_message(msg_id, kind, chan_key(ch), cont)  # suivi même sans réédition (suppression détectée)
+            metrics.inc("botrp_panel_updates_total", kind=kind, result="skipped")
+            continue  # timers natifs : rien à rééditer tant que le contenu est identique
+
+        prio = PRIO_REFRESH if (msg_id and last == sig) else PRIO_CONTENT
+        jobs[cont] = (msg_id, last, sig, local, dispatcher.submit_embeds(pub, (label, cont), msg_id, [emb], prio))
+
+    forbidden, dirty = False, False
+    for cont, (msg_id, last, sig, local, fut) in jobs.items():
+        try:
+            new_id, created = await fut
+        except discord.Forbidden:
+            if not forbidden:
+                log_panel.error("Forbidden : pas la permission d’éditer/écrire", extra=kv(panel=label))
+                forbidden = True
+            metrics.inc("botrp_panel_updates_total", kind=kind, result="failed")
+            continue
         except Exception as e:
-            print(f"[SAISON] {cont}: erreur → {e}")
+            log_panel.error("erreur de publication", extra=kv(panel=label, cont=cont, err=e))
+            metrics.inc("botrp_panel_updates_total", kind=kind, result="failed")
+            continue
+        fields = kv(panel=label, cont=cont, id=new_id)
+        if created and msg_id:
+            log_panel.info("ancien message introuvable → recréation", extra=fields)
+        elif created:
+            log_panel.info("message créé", extra=fields)
+        elif last != sig:
+            log_panel.info("contenu changé → signature maj.", extra=fields)
+        else:
+            log_panel.debug("timers rafraîchis (pas de changement)", extra=fields)
+        metrics.inc("botrp_panel_updates_total", kind=kind, result="created" if created else "edited")
+        dirty = dirty or created or last != sig
+        st["messages"][cont] = new_id
+        if msg_id and msg_id != new_id:
+            untrack_message(msg_id)
+        track_message(new_id, kind, chan_key(ch), cont)
+        st["last_sig"][cont] = sig
+        if track_date:
+            st.setdefault("last_date", {})[cont] = local.strftime("%Y%m%d")
+
+    if dirty:
+        save()  # simple rafraîchissement des timers : l’état n’a pas bougé
+
+async def switch_publisher(pub, st: dict, label: str, save):
+    """Changement d’émetteur (bot ↔ webhook) : les anciens messages sont supprimés puis republiés."""
+    old_via = st.get("via", "bot")
+    old     = await publisher_from_via(pub.ch, old_via)
+    log_panel.info("changement d’émetteur → republication", extra=kv(panel=label, old=old_via, new=pub.via))
+    for msg_id in [*st["messages"].values(), st.get("panel")]:
+        if msg_id:
+            await _delete_quietly(old, msg_id)
+    st["messages"] = {}
+    st["last_sig"] = {}
+    st.pop("panel", None)
+    st.pop("panel_sig", None)
+    st["via"] = pub.via
+    save()
+
+def forget_signatures(conts: set):
+    """Force la réédition de ces continents (icône, légende… ne figurent pas dans les signatures)."""
+    for kind in PANEL_KINDS:
+        for cst in _panel_state(kind)["channels"].values():
+            for c in conts:
+                cst.get("last_sig", {}).pop(c, None)
+            if conts and cst.get("panel"):
+                cst.pop("panel_sig", None)
+
+async def drop_continent_messages(conts: set):
+    """Continents retirés de la configuration : leurs messages séparés sont supprimés."""
+    for kind in PANEL_KINDS:
+        st = _panel_state(kind)
+        for key, cst in st["channels"].items():
+            ids = [cst["messages"].pop(c) for c in conts if cst.get("messages", {}).get(c)]
+            for c in conts:
+                cst.get("last_sig", {}).pop(c, None)
+            if not ids:
+                continue
+            ch = await _get_text_channel(int(key.split(":")[1]), PANEL_KINDS[kind])
+            if ch is not None:
+                pub = await publisher_from_via(ch, cst.get("via", "bot"))
+                for msg_id in ids:
+                    await _delete_quietly(pub, msg_id)
+            (season_state_save_all if kind == "saison" else weather_state_save_all)()
+
+async def publish_panels(kind: str, st: dict, renders: dict, save, track_date: bool = False):
+    """
+    Diffuse des rendus déjà calculés (une fois par tick) vers tous les salons abonnés.
+    renders : {continent: (embed, signature, date_locale)}
+    """
+    async def _one(ch):
+        label = f"{PANEL_KINDS[kind]} #{ch}"
+        cst   = channel_state(st, ch, kind)
+        try:
+            pub = await publisher_for(ch)
+            if cst.get("via", "bot") != pub.via:
+                await switch_publisher(pub, cst, label, save)
+            if COMBINED_PANELS:
+                await ensure_combined_panel(pub, cst, kind, label, renders, save, track_date)
+            else:
+                await drop_combined_panel(pub, cst, label, save)
+                await ensure_split_messages(pub, cst, kind, label, renders, save, track_date)
+        except Exception as e:
+            log_panel.error("erreur", extra=kv(panel=label, err=e))
 
-async def seasons_tick():
-    await client.wait_until_ready()
-    while not client.is_closed():
+    chans = await subscribed_channels(kind)
+    await asyncio.gather(*(_one(ch) for ch in chans))
+
+def _continents_to_render(all_conts, only: Optional[set]) -> list:
+    if COMBINED_PANELS or only is None:
+        return list(all_conts)  # le panneau combiné porte toujours tous les continents
+    return [c for c in all_conts if c in only]
+
+async def seasons_ensure_messages(only: Optional[set] = None):
+    now = utc_now()
+    renders = {}
+    for cont in _continents_to_render(CONTINENT_ZONES.keys(), only):
         try:
-            await seasons_ensure_messages()
+            renders[cont] = render_season(cont, now)
         except Exception as e:
-            print("⚠️ seasons_tick:", e)
-        await asyncio.sleep(60)  # 5 min
+            log_panel.error("rendu impossible", extra=kv(panel="SAISON", cont=cont, err=e))
+    await publish_panels("saison", season_state, renders, season_state_save_all)
 
 # ──────────────────────── METEO ────────────────────────
 
@@ -319,190 +1399,1078 @@ def pick_emoji(continent: str, biome_short: str, season: str, temp_c: int) -> st
         return "🌫️" if temp_c <= 3 else "⛅"
     return "⛅"
 
+def daily_jitter(continent: str, biome_short: str, local_day: str) -> int:
+    """
+    Écart journalier (-2..+2 °C) déterministe : même (continent, biome, date
+    locale 'YYYY-MM-DD') → même valeur, quel que soit le processus ou le redémarrage.
+    """
+    seed = hashlib.sha256(f"{continent}|{biome_short}|{local_day}".encode("utf-8")).digest()
+    return random.Random(int.from_bytes(seed[:8], "big")).randint(-2, 2)
+
+BLEND_EDGE = 0.2  # poids de la saison suivante la veille d’une bascule (1 - BLEND_EDGE le jour même)
+
 def blend_factor(day: int) -> float:
-    if day in (8, 15, 23):  return 0.2
-    if day in (9, 16, 24):  return 0.8
+    """Transition autour des bascules du mois (SEASON_START_DAYS, hors le 1er)."""
+    starts = SEASON_START_DAYS[1:]
+    if day + 1 in starts: return BLEND_EDGE
+    if day in starts:     return 1 - BLEND_EDGE
     return 0.0
 
-WEATHER_STATE_FILE = "meteo_daily_state.json"  # {messages:{continent:id}, last_sig:{}, last_date:{}}
+CONTINENT_ICONS = {"Afrique":"🦁","Amérique":"🐿️","Asie":"🐼","Europe":"🐺","Océanie":"🐹"}
+
+# ──────────────── Tables climatiques compilées ────────────────
+# Compilées une fois au démarrage : continent × biome × saison en listes
+# indexées par entiers. pick_emoji reste la référence : il est évalué sur une
+# plage de températures pour en tirer, par (biome, saison), une fonction en
+# escalier (seuils triés + emojis) → plus aucun test de sous-chaîne par tick.
+
+EMOJI_T_MIN, EMOJI_T_MAX = -60, 60
+
+class ClimateTables:
+    def __init__(self, biomes: dict, n1: dict):
+        self.continents = list(biomes.keys())
+        self.cont_index = {c: i for i, c in enumerate(self.continents)}
+        self.biome_disp  = []  # [ci][bi] -> "🌾 Zones Savanes"
+        self.biome_short = []  # [ci][bi] -> "Savanes"
+        self.base        = []  # [ci][bi][si] -> °C N-1 (None si absent)
+        self.emoji_rule  = []  # [ci][bi][si] -> (seuils, emojis)
+        for cont in self.continents:
+            disp  = list(biomes[cont])
+            short = [short_key(d) for d in disp]
+            self.biome_disp.append(disp)
+            self.biome_short.append(short)
+            self.base.append([[n1.get((cont, b, s)) for s in SEASONS] for b in short])
+            self.emoji_rule.append([[self._compile_rule(cont, b, s) for s in SEASONS] for b in short])
+
+    @staticmethod
+    def _compile_rule(cont: str, biome_short: str, season: str) -> tuple:
+        breaks, emojis = [], [pick_emoji(cont, biome_short, season, EMOJI_T_MIN)]
+        for t in range(EMOJI_T_MIN + 1, EMOJI_T_MAX + 1):
+            e = pick_emoji(cont, biome_short, season, t)
+            if e != emojis[-1]:
+                breaks.append(t)
+                emojis.append(e)
+        return breaks, emojis
+
+    def emoji(self, ci: int, bi: int, si: int, temp_c: int) -> str:
+        breaks, emojis = self.emoji_rule[ci][bi][si]
+        return emojis[bisect.bisect_right(breaks, temp_c)]
+
+CLIMATE = ClimateTables(BIOMES, N1)
+
+# ──────────────── Moteur de prévisions ────────────────
+# Un seul passage par mois calendaire : continent × biome × jour d’un coup
+# (NumPy s’il est installé, sinon Python pur), gardé en cache LRU. La météo du
+# jour, l’aperçu sur plusieurs jours et toute date future ne sont que des lectures.
+
+try:
+    import numpy as np
+except ImportError:  # dépendance optionnelle
+    np = None
+
+FORECAST_CACHE_MONTHS = _env_int("FORECAST_CACHE_MONTHS", 6)
+METEO_OUTLOOK_DAYS    = max(0, min(_env_int("METEO_OUTLOOK", 0), 7))  # 0 = pas d’aperçu ; 7 max (6000 car. par message combiné)
+WEEKDAYS_FR = ["lun.","mar.","mer.","jeu.","ven.","sam.","dim."]
+
+class MonthForecast:
+    """temps[ci][bi][j] / emojis[ci][bi][j] du jour j+1 ; None si la base N-1 manque."""
+
+    def __init__(self, tables: ClimateTables, year: int, month: int, temps: list, emojis: list):
+        self.tables = tables
+        self.year   = year
+        self.month  = month
+        self.temps  = temps
+        self.emojis = emojis
+
+def _month_axes(ndays: int) -> tuple:
+    """Saison courante, saison suivante et facteur de transition pour chaque jour du mois."""
+    si    = [season_index(d) for d in range(1, ndays + 1)]
+    sn    = [(i + 1) % len(SEASONS) for i in si]
+    alpha = [blend_factor(d) for d in range(1, ndays + 1)]
+    return si, sn, alpha
+
+def _month_jitters(tab: ClimateTables, year: int, month: int, ndays: int) -> list:
+    days = [f"{year:04d}-{month:02d}-{d:02d}" for d in range(1, ndays + 1)]
+    return [[[daily_jitter(cont, short, day) for day in days] for short in tab.biome_short[ci]]
+            for ci, cont in enumerate(tab.continents)]
+
+def _batch_temps_py(tab: ClimateTables, si: list, sn: list, alpha: list, jit: list) -> list:
+    out = []
+    for ci, rows in enumerate(tab.base):
+        out.append([[None if row[s] is None or row[n] is None else int(round((1 - a) * row[s] + a * row[n] + j))
+                     for s, n, a, j in zip(si, sn, alpha, jit[ci][bi])]
+                    for bi, row in enumerate(rows)])
+    return out
+
+def _batch_temps_np(tab: ClimateTables, si: list, sn: list, alpha: list, jit: list) -> list:
+    width = max(len(rows) for rows in tab.base)
+    base  = np.full((len(tab.base), width, len(SEASONS)), np.nan)
+    jits  = np.zeros((len(tab.base), width, len(si)))
+    for ci, rows in enumerate(tab.base):
+        for bi, row in enumerate(rows):
+            base[ci, bi] = [np.nan if v is None else v for v in row]
+            jits[ci, bi] = jit[ci][bi]
+    a = np.asarray(alpha)
+    t = np.rint((1 - a) * base[:, :, si] + a * base[:, :, sn] + jits)  # rint : arrondi pair, comme round()
+    valid = ~np.isnan(t)
+    return [[[int(v) if ok else None for v, ok in zip(t[ci, bi].tolist(), valid[ci, bi].tolist())]
+             for bi in range(len(rows))]
+            for ci, rows in enumerate(tab.base)]
+
+_batch_temps = _batch_temps_np if np is not None else _batch_temps_py
+
+@functools.lru_cache(maxsize=FORECAST_CACHE_MONTHS)
+def forecast_month(year: int, month: int) -> MonthForecast:
+    tab   = CLIMATE
+    ndays = calendar.monthrange(year, month)[1]
+    si, sn, alpha = _month_axes(ndays)
+    temps  = _batch_temps(tab, si, sn, alpha, _month_jitters(tab, year, month, ndays))
+    emojis = [[[None if t is None else tab.emoji(ci, bi, s, t) for s, t in zip(si, row)]
+               for bi, row in enumerate(rows)]
+              for ci, rows in enumerate(temps)]
+    return MonthForecast(tab, year, month, temps, emojis)
+
+def forecast_day(continent: str, day: date) -> list:
+    """[(biome_affiché, biome_court, °C, emoji)] pour une date locale quelconque."""
+    fc  = forecast_month(day.year, day.month)
+    tab = fc.tables
+    ci  = tab.cont_index[continent]
+    j   = day.day - 1
+    return [(tab.biome_disp[ci][bi], tab.biome_short[ci][bi], temps[j], fc.emojis[ci][bi][j])
+            for bi, temps in enumerate(fc.temps[ci]) if temps[j] is not None]
+
+def forecast_range(continent: str, start: date, days: int) -> list:
+    """[(date, valeurs)] pour `days` jours consécutifs à partir de start."""
+    return [(d, forecast_day(continent, d)) for d in (start + timedelta(days=k) for k in range(days))]
+
+def meteo_values(continent: str, local: datetime) -> list:
+    """Météo du jour local (lecture dans les prévisions du mois)."""
+    return forecast_day(continent, local.date())
+
+def biome_icon(display: str) -> str:
+    return display.split(" ", 1)[0]
+
+def compact_day_line(d: date, cells: list, with_month: bool = False) -> str:
+    """« `lun. 03` 🌳⛅12° · ⛰️🌨️-4° » ; cells = [(icône, emoji, °C)]."""
+    day = f"{d.day:02d}/{d.month:02d}" if with_month else f"{d.day:02d}"
+    return f"`{WEEKDAYS_FR[d.weekday()]} {day}` " + " · ".join(f"{i}{e}{t}°" for i, e, t in cells)
+
+def outlook_text(continent: str, today: date, days: int) -> str:
+    """Une ligne par jour à venir : icône de biome, emoji, °C."""
+    return "\n".join(compact_day_line(d, [(biome_icon(disp), emoji, t) for disp, _, t, emoji in values])
+                     for d, values in forecast_range(continent, today + timedelta(days=1), days))
+
+# ──────────────── Configuration climatique (fichier, rechargement à chaud) ────────────────
+# CLIMATE_FILE (JSON, ou TOML si l’extension est .toml) remplace les données
+# intégrées ci-dessus. Il est validé en entier avant d’être appliqué, puis
+# surveillé (mtime) : une modification valide est basculée d’un bloc (aucun
+# await pendant l’échange) et seuls les continents modifiés sont réédités.
+# Schéma : voir climate.example.json.
+
+CLIMATE_FILE   = os.getenv("CLIMATE_FILE", "climate.json").strip()
+CLIMATE_POLL_S = _env_int("CLIMATE_POLL", 10)  # 0 = pas de surveillance
+
+class ClimateConfigError(ValueError):
+    pass
+
+def parse_offset(text) -> tuple:
+    """« +01:30 » → (1, 30) ; « -06:30 » → (-6, -30) (même convention que CONTINENT_OFFSETS)."""
+    m = re.fullmatch(r"([+-])(\d{1,2})(?::?(\d{2}))?", str(text).strip())
+    if not m or int(m.group(2)) > 14 or int(m.group(3) or 0) >= 60:
+        raise ValueError(f"décalage invalide : {text!r} (attendu ±HH:MM)")
+    sign = -1 if m.group(1) == "-" else 1
+    return sign * int(m.group(2)), sign * int(m.group(3) or 0)
+
+def format_offset(h: int, m: int) -> str:
+    sign = "-" if h < 0 or m < 0 else "+"
+    return f"{sign}{abs(h):02d}:{abs(m):02d}"
+
+def parse_zone(spec: dict):
+    """« zone » (nom IANA, heure d’été comprise) ou « offset » (±HH:MM fixe) → tzinfo."""
+    if "zone" in spec and "offset" in spec:
+        raise ValueError("« zone » ou « offset », pas les deux")
+    if "zone" not in spec:
+        return fixed_zone(*parse_offset(spec.get("offset", "")))
+    try:
+        return ZoneInfo(str(spec["zone"]))
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"fuseau inconnu : {spec['zone']!r} (nom IANA attendu, ex. « Europe/Paris »)")
+
+def zone_spec(zone) -> dict:
+    """Inverse de parse_zone (sert aussi d’empreinte : deux fuseaux égaux ont la même)."""
+    if isinstance(zone, ZoneInfo):
+        return {"zone": zone.key}
+    minutes = int(zone.utcoffset(None).total_seconds() // 60)
+    sign = -1 if minutes < 0 else 1
+    return {"offset": format_offset(sign * (abs(minutes) // 60), sign * (abs(minutes) % 60))}
+
+def builtin_climate_doc() -> dict:
+    """Données intégrées, au format du fichier de configuration."""
+    return {
+        "seasons":    dict(zip(SEASONS, SEASON_START_DAYS)),
+        "emoji_desc": dict(EMOJI_DESC),
+        "continents": {
+            cont: {
+                **zone_spec(CONTINENT_ZONES[cont]),
+                "icon":   CONTINENT_ICONS[cont],
+                "biomes": {disp: {s: N1[(cont, short_key(disp), s)] for s in SEASONS if (cont, short_key(disp), s) in N1}
+                           for disp in BIOMES[cont]},
+            }
+            for cont in BIOMES
+        },
+    }
+
+def parse_climate(doc: dict) -> dict:
+    """Valide un document de configuration ; lève ClimateConfigError avec la liste de tous les problèmes."""
+    errors = []
+    if not isinstance(doc, dict):
+        raise ClimateConfigError("la racine doit être un objet")
+
+    seasons = doc.get("seasons", dict(zip(SEASONS, SEASON_START_DAYS)))
+    days = ()
+    if not isinstance(seasons, dict) or set(seasons) != set(SEASONS):
+        errors.append(f"seasons : exactement {', '.join(SEASONS)} attendues")
+    else:
+        days = tuple(seasons[s] for s in SEASONS)
+        if not all(isinstance(d, int) for d in days) or days[0] != 1 or list(days) != sorted(set(days)) or days[-1] > 28:
+            errors.append(f"seasons : jours de début entiers, croissants, de 1 à 28 dans l’ordre {'/'.join(SEASONS)} ({days})")
+
+    emoji_desc = doc.get("emoji_desc", EMOJI_DESC)
+    if not isinstance(emoji_desc, dict) or not all(isinstance(v, str) for v in emoji_desc.values()):
+        errors.append("emoji_desc : objet emoji → description attendu")
+
+    conts = doc.get("continents")
+    biomes, n1, zones, icons = {}, {}, {}, {}
+    if not isinstance(conts, dict) or not conts:
+        errors.append("continents : objet non vide attendu")
+        conts = {}
+    for cont, spec in conts.items():
+        if not isinstance(spec, dict):
+            errors.append(f"{cont} : objet attendu")
+            continue
+        try:
+            zones[cont] = parse_zone(spec)
+        except ValueError as e:
+            errors.append(f"{cont} : {e}")
+        icons[cont] = str(spec.get("icon", "🌍"))
+        cont_biomes = spec.get("biomes")
+        if not isinstance(cont_biomes, dict) or not cont_biomes:
+            errors.append(f"{cont} : biomes manquants")
+            continue
+        biomes[cont], shorts = [], set()
+        for disp, temps in cont_biomes.items():
+            if " " not in disp.strip():
+                errors.append(f"{cont} / {disp} : nom attendu sous la forme « <emoji> Zones <Nom> »")
+                continue
+            short = short_key(disp)
+            if short in shorts:
+                errors.append(f"{cont} / {disp} : biome « {short} » en double")
+                continue
+            shorts.add(short)
+            if not isinstance(temps, dict):
+                errors.append(f"{cont} / {disp} : objet saison → °C attendu")
+                continue
+            missing = [s for s in SEASONS if s not in temps]
+            unknown = [s for s in temps if s not in SEASONS]
+            if missing:
+                errors.append(f"{cont} / {disp} : saison(s) manquante(s) : {', '.join(missing)}")
+            if unknown:
+                errors.append(f"{cont} / {disp} : saison(s) inconnue(s) : {', '.join(unknown)}")
+            for s in SEASONS:
+                v = temps.get(s)
+                if s in temps and (isinstance(v, bool) or not isinstance(v, (int, float))):
+                    errors.append(f"{cont} / {disp} / {s} : température numérique attendue ({v!r})")
+                elif s in temps:
+                    n1[(cont, short, s)] = v
+            biomes[cont].append(disp)
+
+    if errors:
+        raise ClimateConfigError("\n".join(errors))
+    return {"biomes": biomes, "n1": n1, "zones": zones, "icons": icons,
+            "season_days": days, "emoji_desc": dict(emoji_desc)}
+
+def load_climate_file(path: str) -> dict:
+    if path.endswith(".toml"):
+        import tomllib
+        with open(path, "rb") as f:
+            return parse_climate(tomllib.load(f))
+    with open(path, "r", encoding="utf-8") as f:
+        return parse_climate(json.load(f))
+
+def _climate_fingerprints() -> tuple:
+    """(empreinte par continent, empreinte globale) pour repérer ce qu’un rechargement change."""
+    per = {c: (zone_spec(CONTINENT_ZONES[c]), CONTINENT_ICONS.get(c),
+               tuple((d, tuple(N1.get((c, short_key(d), s)) for s in SEASONS)) for d in BIOMES[c]))
+           for c in BIOMES}
+    return per, (SEASON_START_DAYS, tuple(sorted(EMOJI_DESC.items())))
+
+def apply_climate(cfg: dict) -> tuple:
+    """Bascule synchrone (atomique vis-à-vis de la boucle) ; retourne (modifiés, retirés, échéances_changées)."""
+    global BIOMES, N1, EMOJI_DESC, CONTINENT_ZONES, CONTINENT_ICONS, SEASON_START_DAYS, CLIMATE
+    old_per, old_glob = _climate_fingerprints()
+    old_sched = (SEASON_START_DAYS, {c: zone_spec(z) for c, z in CONTINENT_ZONES.items()})
+    tables = ClimateTables(cfg["biomes"], cfg["n1"])  # compilé avant l’échange : rien n’est touché en cas d’erreur
+    BIOMES, N1, EMOJI_DESC = cfg["biomes"], cfg["n1"], cfg["emoji_desc"]
+    CONTINENT_ZONES, CONTINENT_ICONS = cfg["zones"], cfg["icons"]
+    SEASON_START_DAYS, CLIMATE = cfg["season_days"], tables
+    forecast_month.cache_clear()
+    render_cache.invalidate()
+    _CLOCKS.clear()
+    new_per, new_glob = _climate_fingerprints()
+    changed = set(new_per) if new_glob != old_glob else {c for c in new_per if new_per[c] != old_per.get(c)}
+    removed = set(old_per) - set(new_per)
+    return changed, removed, (SEASON_START_DAYS, {c: zone_spec(z) for c, z in CONTINENT_ZONES.items()}) != old_sched
+
+_CLIMATE_STAMP = None  # (mtime_ns, taille) du fichier appliqué (ou rejeté)
+
+def _climate_stamp() -> Optional[tuple]:
+    try:
+        st = os.stat(CLIMATE_FILE)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
 
-def weather_state_load():
+def load_initial_climate():
+    """Au démarrage : un fichier présent mais invalide est fatal (plutôt que publier de fausses données)."""
+    global _CLIMATE_STAMP
     try:
-        with open(WEATHER_STATE_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return {"messages":{}, "last_sig":{}, "last_date":{}}
+        apply_climate(parse_climate(builtin_climate_doc()))  # contrôle aussi les données intégrées
+    except ClimateConfigError as e:
+        log_diag.critical("données climatiques intégrées incohérentes", extra=kv(errors=str(e)))
+        raise
+    _CLIMATE_STAMP = _climate_stamp()
+    if _CLIMATE_STAMP is None:
+        return
+    try:
+        cfg = load_climate_file(CLIMATE_FILE)
+    except (OSError, ValueError) as e:
+        log_diag.critical("fichier climatique invalide", extra=kv(file=CLIMATE_FILE, errors=str(e)))
+        _log_listener.stop()
+        sys.exit(1)
+    apply_climate(cfg)
+    log_diag.info("configuration climatique chargée", extra=kv(file=CLIMATE_FILE, continents=len(BIOMES)))
 
-def weather_state_save(st):
+load_initial_climate()
+
+async def reload_climate_if_changed() -> bool:
+    global _CLIMATE_STAMP
+    stamp = _climate_stamp()
+    if stamp is None or stamp == _CLIMATE_STAMP:
+        return False
+    _CLIMATE_STAMP = stamp
     try:
-        with open(WEATHER_STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(st, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print("⚠️ save meteo:", e)
+        cfg = load_climate_file(CLIMATE_FILE)
+    except (OSError, ValueError) as e:
+        log_diag.error("fichier climatique rejeté, configuration précédente conservée", extra=kv(file=CLIMATE_FILE, errors=str(e)))
+        metrics.inc("botrp_climate_reloads_total", result="rejected")
+        return False
+    changed, removed, sched_changed = apply_climate(cfg)
+    metrics.inc("botrp_climate_reloads_total", result="applied")
+    log_diag.info("configuration climatique rechargée", extra=kv(file=CLIMATE_FILE, changed=",".join(sorted(changed)) or "-",
+                                                                removed=",".join(sorted(removed)) or "-"))
+    forget_signatures(changed)
+    now = utc_now()
+    if sched_changed:
+        scheduler.replan(now)
+    for cont in sorted(changed):
+        scheduler.push(now, "saison", cont)
+        scheduler.push(now, "meteo", cont)
+    if removed and COMBINED_PANELS:
+        # le panneau combiné porte encore l’embed retiré : réédition immédiate
+        forget_signatures(removed)
+        scheduler.trigger("saison", now)
+        scheduler.trigger("meteo", now)
+    if removed:
+        await drop_continent_messages(removed)
+    return True
+
+async def climate_watch():
+    while True:
+        await asyncio.sleep(CLIMATE_POLL_S)
+        await reload_climate_if_changed()
+
+def weather_state_load():
+    return load_state("meteo", {"channels":{}})
+
+def weather_state_save(st):
+    state_saver.mark("meteo", st)
+
+def weather_state_save_all():
+    weather_state_save(weather_state)
 
 weather_state = weather_state_load()
 
 def continent_local_now(cont: str, now_utc: datetime) -> datetime:
-    h, m = CONTINENT_OFFSETS[cont]
-    return apply_offset_utc(now_utc, h, m)
+    return now_utc.astimezone(CONTINENT_ZONES[cont])
+
+def meteo_field_value(t: int, emoji: str) -> str:
+    return f"🌡️ **{t} °C**\nMétéo : {emoji}\n*({EMOJI_DESC.get(emoji, '')})*"
 
 def meteo_embed(continent: str, now_utc: datetime):
-    local = continent_local_now(continent, now_utc)
-    season = season_from_day(local.day)
-    alpha  = blend_factor(local.day)
-    season_next = next_season(season)
+    today  = local_day(continent, now_utc)
+    season = today.season
 
-    icon = {"Afrique":"🦁","Amérique":"🐿️","Asie":"🐼","Europe":"🐺","Océanie":"🐹"}[continent]
+    icon = CONTINENT_ICONS[continent]
     title = f"{icon} {continent} — Météo régionale"
     desc  = ""
 
+    day_key = today.day.strftime("%Y-%m-%d")
     fields_for_sig = []
     emb = discord.Embed(title=title, description=desc, color=discord.Color.blue())
 
-    for biome_disp in BIOMES[continent]:
-        short = short_key(biome_disp)
-        base_cur  = N1.get((continent, short, season))
-        base_next = N1.get((continent, short, season_next))
-        if base_cur is None or base_next is None:
-            continue
-        t = (1 - alpha) * base_cur + alpha * base_next
-        t += random.randint(-2, 2)
-        t = int(round(t))
-
-        emoji = pick_emoji(continent, short, season, t)
-        legend = EMOJI_DESC.get(emoji, "")
-        value = f"🌡️ **{t} °C**\nMétéo : {emoji}\n*({legend})*"
-
-        emb.add_field(name=biome_disp, value=value, inline=True)
+    for biome_disp, short, t, emoji in forecast_day(continent, today.day):
+        emb.add_field(name=biome_disp, value=meteo_field_value(t, emoji), inline=True)
         fields_for_sig.append((short, t, emoji))
 
-    now_paris = to_paris(now_utc)
-    local_midnight = local.replace(hour=0, minute=0, second=0, microsecond=0)
-    next_local_midnight = local_midnight + timedelta(days=1)
-    h_off, m_off = CONTINENT_OFFSETS[continent]
-    next_midnight_utc = (next_local_midnight - timedelta(hours=h_off, minutes=m_off)).replace(tzinfo=timezone.utc)
-    next_midnight_paris = to_paris(next_midnight_utc)
+    if METEO_OUTLOOK_DAYS:
+        emb.add_field(name=f"📅 Prévisions {METEO_OUTLOOK_DAYS} jours",
+                      value=outlook_text(continent, today.day, METEO_OUTLOOK_DAYS), inline=False)
 
     emb.description = (emb.description or "") + (
-        f"\n\n**Horaires (Europe/Paris)**\n"
-        f"• Prochaine Météo : {fmt_rel_fr(now_paris, next_midnight_paris, future=True)}\n"
+        f"\n\n**{timers_header()}**\n"
+        f"• Prochaine Météo : {fmt_countdown(now_utc, today.next_midnight_utc)}\n"
     )
-    emb.timestamp = now_paris
-    emb.set_footer(text=f"Heure affichée : Europe/Paris • Saison : {season}")
+    stamp_embed(emb, now_utc, today.start_utc)
+    emb.set_footer(text=timers_footer(f"Saison : {season}"))
+
+    flat = "|".join(f"{n}:{t}:{e}:{EMOJI_DESC.get(e, '')}" for (n,t,e) in fields_for_sig)
+    outlook = f"|o{METEO_OUTLOOK_DAYS}" if METEO_OUTLOOK_DAYS else ""
+    sig  = hashlib.sha256(f"{RENDER_TAG}|{continent}|{icon}|{day_key}|{flat}{outlook}".encode("utf-8")).hexdigest()
+    return emb, sig, today.day
+
+def render_meteo(continent: str, now_utc: datetime):
+    """(embed, signature, date_locale) depuis le cache de rendu."""
+    return render_cache.get_or_render(render_key("meteo", continent, now_utc), lambda: meteo_embed(continent, now_utc))
+
+def forecast_embed(continent: str, day: date):
+    """Prévision d’une date locale quelconque (sans minuteurs : rien à rafraîchir)."""
+    season = season_from_day(day.day)
+    emb = discord.Embed(title=f"{CONTINENT_ICONS[continent]} {continent} — Météo du {WEEKDAYS_FR[day.weekday()]} {day:%d/%m/%Y}",
+                        color=discord.Color.blue())
+    for biome_disp, _, t, emoji in forecast_day(continent, day):
+        emb.add_field(name=biome_disp, value=meteo_field_value(t, emoji), inline=True)
+    emb.set_footer(text=f"Saison : {SEASON_EMOJI[season]} {season}")
+    return emb, None, day
+
+def render_forecast(continent: str, day: date):
+    key = ("prevision", continent, day.isoformat(), season_from_day(day.day), None)
+    return render_cache.get_or_render(key, lambda: forecast_embed(continent, day))
+
+async def weather_ensure_messages(only: Optional[set] = None):
+    now = utc_now()
+    renders = {}
+    for cont in _continents_to_render(BIOMES.keys(), only):
+        try:
+            renders[cont] = render_meteo(cont, now)
+        except Exception as e:
+            log_panel.error("rendu impossible", extra=kv(panel="METEO", cont=cont, err=e))
+    await publish_panels("meteo", weather_state, renders, weather_state_save_all, track_date=True)
+    await archive_weather(renders)
+
+# ──────────────────────── HISTORIQUE ────────────────────────
+# Archive en ajout seul de chaque journée météo générée, une ligne par
+# (continent, jour local, biome). La clé primaire d’une table WITHOUT ROWID
+# range les lignes par continent puis par date : une plage de dates est un
+# simple parcours d’index, quel que soit le volume archivé.
+
+HISTORY_DB        = os.getenv("HISTORY_DB", "bot_history.db").strip()  # vide = pas d’archive
+HISTORY_DAYS      = _env_int("HISTORY_DAYS", 730)                      # rétention (0 = illimitée)
+HISTORY_MAX_RANGE = 31                                                 # /historique : jours par requête
+
+class WeatherHistory:
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._db   = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA auto_vacuum=INCREMENTAL")  # pris en compte à la création du fichier
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS weather ("
+            " continent TEXT NOT NULL, day TEXT NOT NULL, biome TEXT NOT NULL,"
+            " temp INTEGER NOT NULL, emoji TEXT NOT NULL, season TEXT NOT NULL,"
+            " PRIMARY KEY (continent, day, biome)) WITHOUT ROWID"
+        )
+        self._db.commit()
+        self.recorded  = set()  # (continent, jour) déjà archivés par ce processus
+        self.pruned_on = None   # dernier jour de purge
+
+    def append(self, rows: list) -> int:
+        """rows : [(continent, 'AAAA-MM-JJ', biome, °C, emoji, saison)] ; une journée déjà archivée ne change plus."""
+        with self._lock, self._db:
+            return self._db.executemany("INSERT OR IGNORE INTO weather VALUES (?, ?, ?, ?, ?, ?)", rows).rowcount
+
+    def query(self, continent: str, start: date, end: date, biome: Optional[str] = None) -> list:
+        """[(date, biome, °C, emoji, saison)] triés par date, bornes incluses."""
+        sql  = "SELECT day, biome, temp, emoji, season FROM weather WHERE continent = ? AND day BETWEEN ? AND ?"
+        args = [continent, start.isoformat(), end.isoformat()]
+        if biome:
+            sql += " AND biome = ?"
+            args.append(biome)
+        with self._lock:
+            rows = self._db.execute(sql, args).fetchall()
+        return [(date.fromisoformat(d), b, t, e, s) for d, b, t, e, s in rows]
+
+    def prune(self, before: date) -> int:
+        with self._lock:
+            with self._db:
+                n = self._db.execute("DELETE FROM weather WHERE day < ?", (before.isoformat(),)).rowcount
+            if n:
+                self._db.execute("PRAGMA incremental_vacuum")  # rend les pages libérées au système
+        return n
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+history = WeatherHistory(HISTORY_DB) if HISTORY_DB else None
+
+def _archive_write(rows: list, keys: set, prune_before: Optional[date]) -> set:
+    """Retourne les (continent, jour) archivés ; vide en cas d’échec (nouvel essai au prochain rendu)."""
+    try:
+        history.append(rows)
+    except sqlite3.Error as e:
+        log_state.error("échec d’écriture de l’historique", extra=kv(err=e))
+        return set()
+    if prune_before is not None:
+        try:
+            n = history.prune(prune_before)
+            if n:
+                log_state.info("historique purgé", extra=kv(rows=n, before=prune_before.isoformat()))
+        except sqlite3.Error as e:
+            log_state.error("échec de purge de l’historique", extra=kv(err=e))
+    return keys
+
+async def archive_weather(renders: dict):
+    """Archive les journées rendues pas encore enregistrées (écriture hors boucle)."""
+    if history is None:
+        return
+    rows, keys, newest = [], set(), None
+    for cont, (_, _, day) in renders.items():
+        if (cont, day) in history.recorded:
+            continue
+        keys.add((cont, day))
+        season = season_from_day(day.day)
+        rows += [(cont, day.isoformat(), short, t, emoji, season) for _, short, t, emoji in forecast_day(cont, day)]
+        newest = max(newest or day, day)
+    if not rows:
+        return
+    prune_before = None
+    if HISTORY_DAYS and newest != history.pruned_on:
+        history.pruned_on = newest
+        prune_before = newest - timedelta(days=HISTORY_DAYS)
+    history.recorded |= await asyncio.get_running_loop().run_in_executor(None, _archive_write, rows, keys, prune_before)
+
+def history_embed(continent: str, start: date, end: date, biome: Optional[str] = None):
+    rows  = history.query(continent, start, end, biome)
+    ci    = CLIMATE.cont_index.get(continent)
+    icons = {} if ci is None else {short: biome_icon(disp) for disp, short in zip(CLIMATE.biome_disp[ci], CLIMATE.biome_short[ci])}
+    title = f"{CONTINENT_ICONS[continent]} {continent} — Historique météo" + (f" ({biome})" if biome else "")
+    emb   = discord.Embed(title=title, color=discord.Color.dark_blue())
+    if biome:
+        lines = [f"`{WEEKDAYS_FR[d.weekday()]} {d:%d/%m}` {e} **{t} °C** · {SEASON_EMOJI.get(s, '')} {s}" for d, _, t, e, s in rows]
+    else:
+        by_day = OrderedDict()
+        for d, b, t, e, _ in rows:
+            by_day.setdefault(d, []).append((b, t, e))
+        order = {short: i for i, short in enumerate(icons)}
+        lines = [compact_day_line(d, [(icons.get(b, b), e, t) for b, t, e in sorted(cells, key=lambda c: order.get(c[0], len(order)))],
+                                  with_month=True)
+                 for d, cells in by_day.items()]
+    emb.description = "\n".join(lines) or "Aucune donnée archivée sur cette période."
+    emb.set_footer(text=f"Du {start:%d/%m/%Y} au {end:%d/%m/%Y} (dates locales)")
+    return emb
+
+# ──────────────────────── PLANIFICATEUR ────────────────────────
+# Au lieu de sonder toutes les 60 s, on calcule la prochaine échéance de chaque
+# continent (minuit local / bascule de saison) et on dort jusqu’à la plus proche.
+
+SCHED_JITTER_S    = _env_int("SCHED_JITTER", 3)  # gigue max (s) après une échéance
+SCHED_MAX_SLEEP_S = 900   # re-vérifie l’horloge murale (suspension, dérive NTP…)
+SCHED_LATE_S      = 30    # au-delà : échéance considérée « en rattrapage »
+FR_REFRESH_S      = 60    # TIMER_MODE=fr : les textes « dans … » doivent être réédités
+
+def next_event_utc(kind: str, cont: Optional[str], now_utc: datetime) -> datetime:
+    if kind == "refresh":
+        return (now_utc + timedelta(seconds=FR_REFRESH_S)).replace(second=0, microsecond=0)
+    # « saison » comme « meteo » : la date locale de référence change à chaque minuit
+    # local, et un début de saison tombe toujours sur l’un d’eux
+    return local_day(cont, now_utc).next_midnight_utc
+
+class BoundaryScheduler:
+    """Tas-min d’échéances (due_utc, kind, continent) ; un seul réveil par échéance."""
+
+    def __init__(self):
+        self._heap = []
+        self._planned = {}  # (kind, cont) -> due_utc (les entrées obsolètes du tas sont ignorées)
+        self._seq = 0
+        self._wake = asyncio.Event()
+
+    def push(self, due_utc: datetime, kind: str, cont: Optional[str] = None):
+        key = (kind, cont)
+        cur = self._planned.get(key)
+        if cur is not None and cur <= due_utc:
+            return
+        self._planned[key] = due_utc
+        self._seq += 1
+        heapq.heappush(self._heap, (due_utc, self._seq, kind, cont))
+        self._wake.set()
+
+    def plan(self, kind: str, cont: Optional[str], now_utc: datetime):
+        self.push(next_event_utc(kind, cont, now_utc), kind, cont)
+
+    def trigger(self, kind: str, now_utc: Optional[datetime] = None):
+        """Échéance immédiate pour tous les continents d’un type (nouvel abonnement…)."""
+        now_utc = now_utc or utc_now()
+        for cont in (CONTINENT_ZONES.keys() if kind == "saison" else BIOMES.keys()):
+            self.push(now_utc, kind, cont)
+
+    def replan(self, now_utc: datetime):
+        """Oublie toutes les échéances (décalages / seuils modifiés) et replanifie."""
+        self._heap.clear()
+        self._planned.clear()
+        self.plan_all(now_utc)
+
+    def plan_all(self, now_utc: datetime):
+        for cont in CONTINENT_ZONES.keys():
+            self.plan("saison", cont, now_utc)
+        for cont in BIOMES.keys():
+            self.plan("meteo", cont, now_utc)
+        if not NATIVE_TIMERS:
+            self.plan("refresh", None, now_utc)
+
+    def next_due(self) -> Optional[datetime]:
+        while self._heap:
+            due, _, kind, cont = self._heap[0]
+            if self._planned.get((kind, cont)) == due:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now_utc: datetime) -> set:
+        jobs = set()
+        while self._heap and self._heap[0][0] <= now_utc:
+            due, _, kind, cont = heapq.heappop(self._heap)
+            if self._planned.get((kind, cont)) != due:
+                continue
+            del self._planned[(kind, cont)]
+            if (now_utc - due).total_seconds() > SCHED_LATE_S:
+                log_sched.warning("rattrapage d’une échéance dépassée", extra=kv(kind=kind, cont=cont, due=f"{due:%Y-%m-%d %H:%M}Z"))
+            jobs.add((kind, cont))
+        return jobs
+
+    async def run(self, handler):
+        while not client.is_closed():
+            due = self.next_due()
+            if due is None:
+                self._wake.clear()
+                await self._wake.wait()
+                continue
+            delay = (due - utc_now()).total_seconds()
+            if delay > 0:
+                # sommeil borné : asyncio dort sur l’horloge monotone, qui ne
+                # compte pas toujours une mise en veille de la machine
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=min(delay, SCHED_MAX_SLEEP_S))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            jobs = self.pop_due(utc_now())  # toutes les échéances dépassées, regroupées
+            if SCHED_JITTER_S > 0:
+                await asyncio.sleep(random.uniform(0, SCHED_JITTER_S))
+            try:
+                await handler(jobs)
+            except Exception as e:
+                log_sched.exception("échec du passage", extra=kv(err=e))
+            now = utc_now()
+            for kind, cont in jobs:
+                self.plan(kind, cont, now)
 
-    flat = "|".join(f"{n}:{t}:{e}" for (n,t,e) in fields_for_sig)
-    sig  = hashlib.sha256(f"{continent}|{local.strftime('%Y-%m-%d')}|{flat}".encode("utf-8")).hexdigest()
-    return emb, sig, local
+scheduler = BoundaryScheduler()
 
-async def weather_ensure_messages():
-    ch = await _get_text_channel(CHANNEL_METEO, "METEO")
+async def _run_due_jobs(jobs: set):
+    t0 = time.perf_counter()
+    try:
+        await _dispatch_due_jobs(jobs)
+    finally:
+        metrics.observe("botrp_tick_duration_seconds", time.perf_counter() - t0,
+                        trigger="refresh" if ("refresh", None) in jobs else "boundary")
+
+async def _dispatch_due_jobs(jobs: set):
+    if ("refresh", None) in jobs:
+        seasons, meteo = None, None  # textes FR : tout rafraîchir
+    else:
+        seasons = {c for k, c in jobs if k == "saison"}
+        meteo   = {c for k, c in jobs if k == "meteo"}
+        for kind, cont in jobs:
+            render_cache.invalidate(cont, kind)  # bascule : les rendus de la veille sont périmés
+    tasks = []
+    if seasons is None or seasons:
+        tasks.append(seasons_ensure_messages(seasons))
+    if meteo is None or meteo:
+        tasks.append(weather_ensure_messages(meteo))
+    # salons indépendants : la file d’envoi les traite en parallèle
+    await asyncio.gather(*tasks)
+
+async def scheduler_tick():
+    # une passe concurrente ne verrait pas les messages en cours de création
+    # (identifiant encore absent de l’état) et en publierait un second
+    await startup_done.wait()
+    scheduler.plan_all(utc_now())
+    await scheduler.run(_run_due_jobs)
+
+# ──────────────── Superviseur de tâches ────────────────
+# Une seule instance par tâche nommée, quel que soit le nombre de reconnexions ;
+# une boucle qui plante est relancée avec un backoff exponentiel.
+
+SUPERVISOR_BACKOFF_S     = 1.0
+SUPERVISOR_BACKOFF_MAX_S = 300.0
+SUPERVISOR_STABLE_S      = 600.0  # au-delà, un plantage repart du backoff minimal
+
+metrics.describe("botrp_task_restarts_total", "counter", "Relances de tâches supervisées après plantage")
+metrics.describe("botrp_climate_reloads_total", "counter", "Rechargements du fichier climatique (appliqués/rejetés)")
+
+class TaskSupervisor:
+    def __init__(self):
+        self._tasks = {}  # nom -> asyncio.Task
+
+    def start(self, name: str, factory, restart: bool = True) -> "asyncio.Task":
+        """Lance factory() sous supervision, sauf si une instance tourne déjà."""
+        task = self._tasks.get(name)
+        if task is not None and not task.done():
+            return task
+        task = self._tasks[name] = asyncio.create_task(self._guard(name, factory, restart), name=f"botrp:{name}")
+        return task
+
+    def running(self) -> list:
+        return sorted(n for n, t in self._tasks.items() if not t.done())
+
+    async def _guard(self, name: str, factory, restart: bool):
+        loop  = asyncio.get_running_loop()
+        delay = SUPERVISOR_BACKOFF_S
+        while True:
+            t0 = loop.time()
+            try:
+                await factory()
+                if not restart or client.is_closed():
+                    return
+                log_diag.warning("tâche terminée, relance", extra=kv(task=name))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if not restart:
+                    log_diag.exception("tâche plantée", extra=kv(task=name, err=e))
+                    return
+                log_diag.exception("tâche plantée, relance", extra=kv(task=name, err=e, retry_s=delay))
+                metrics.inc("botrp_task_restarts_total", task=name)
+            if loop.time() - t0 > SUPERVISOR_STABLE_S:
+                delay = SUPERVISOR_BACKOFF_S
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, SUPERVISOR_BACKOFF_MAX_S)
+
+    async def stop(self):
+        tasks = [t for t in self._tasks.values() if not t.done()]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+supervisor = TaskSupervisor()
+
+# ──────────────────────── COMMANDES ────────────────────────
+
+def forget_channel_state(kind: str, guild_id: int, chan_id: int):
+    st = season_state if kind == "saison" else weather_state
+    if st["channels"].pop(f"{guild_id}:{chan_id}", None) is not None:
+        (season_state_save_all if kind == "saison" else weather_state_save_all)()
+        rebuild_message_index()
+
+async def retire_channel_panels(kind: str, guild_id: int, chan_id: int):
+    """Panneau déplacé ou retiré : supprime ses messages de l’ancien salon, puis oublie son état."""
+    cst = _panel_state(kind)["channels"].get(f"{guild_id}:{chan_id}") or {}
+    ids = [i for i in (*cst.get("messages", {}).values(), cst.get("panel")) if i]
+    forget_channel_state(kind, guild_id, chan_id)  # plus aucune passe ne touche ce salon
+    if not ids:
+        return
+    ch = await _get_text_channel(chan_id, PANEL_KINDS[kind])
     if ch is None:
         return
-
-    now = utc_now()
-    for cont in BIOMES.keys():
+    try:
+        pub = await publisher_from_via(ch, cst.get("via", "bot"))
+    except discord.HTTPException as e:
+        log_panel.warning("anciens messages non supprimés", extra=kv(chan=chan_key(ch), err=e))
+        return
+    for msg_id in ids:
+        await _delete_quietly(pub, msg_id)
+
+panneaux = app_commands.Group(
+    name="panneaux",
+    description="Salons des panneaux saisons / météo de ce serveur",
+    guild_only=True,
+    default_permissions=discord.Permissions(manage_guild=True),
+)
+
+PANEL_CHOICES = [
+    app_commands.Choice(name="Saisons", value="saison"),
+    app_commands.Choice(name="Météo",   value="meteo"),
+]
+
+@panneaux.command(name="definir", description="Publie (ou déplace) un panneau dans un salon")
+@app_commands.describe(panneau="Panneau à publier", salon="Salon texte cible")
+@app_commands.choices(panneau=PANEL_CHOICES)
+async def panneaux_definir(interaction: discord.Interaction, panneau: app_commands.Choice[str], salon: discord.TextChannel):
+    old = guild_config.get(str(interaction.guild_id), {}).get(panneau.value)
+    set_guild_channel(interaction.guild_id, panneau.value, salon.id)
+    _CHANNEL_FAILED.pop(salon.id, None)  # choisi explicitement : nouvel essai immédiat
+    scheduler.trigger(panneau.value)
+    await interaction.response.send_message(f"✅ Panneau {panneau.name} → {salon.mention}", ephemeral=True)
+    if old and old != salon.id:
+        await retire_channel_panels(panneau.value, interaction.guild_id, old)  # après la réponse (délai de 3 s)
+
+@panneaux.command(name="retirer", description="Arrête de mettre à jour un panneau sur ce serveur")
+@app_commands.choices(panneau=PANEL_CHOICES)
+async def panneaux_retirer(interaction: discord.Interaction, panneau: app_commands.Choice[str]):
+    old = guild_config.get(str(interaction.guild_id), {}).get(panneau.value)
+    set_guild_channel(interaction.guild_id, panneau.value, None)
+    await interaction.response.send_message(f"🗑️ Panneau {panneau.name} retiré.", ephemeral=True)
+    if old:
+        await retire_channel_panels(panneau.value, interaction.guild_id, old)
+        forget_channel(old)
+
+tree.add_command(panneaux)
+
+# Consultations à la demande : réponse éphémère servie par le cache de rendu
+# (les mêmes embeds que les panneaux), jamais de lecture d’état.
+
+COMMAND_COOLDOWN_S = _env_int("COMMAND_COOLDOWN", 10)  # par utilisateur et par commande
+FORECAST_MAX_DAYS  = 366                               # /meteo date : ± un an autour d’aujourd’hui
+
+metrics.describe("botrp_commands_total", "counter", "Commandes de consultation servies")
+
+CONTINENT_CHOICES = [app_commands.Choice(name=f"{CONTINENT_ICONS[c]} {c}", value=c) for c in CONTINENT_ZONES]
+
+def parse_local_date(text: str, today: date) -> Optional[date]:
+    """« AAAA-MM-JJ », « JJ/MM/AAAA » ou « JJ/MM » (année courante)."""
+    text = text.strip()
+    for fmt in ("%Y-%m-%d", "%d/%m/%Y"):
         try:
-            emb, sig, local = meteo_embed(cont, now)
-
-            msg_id = weather_state["messages"].get(cont)
-            last   = weather_state["last_sig"].get(cont)
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            pass
+    try:
+        return datetime.strptime(f"{text}/{today.year}", "%d/%m/%Y").date()
+    except ValueError:
+        return None
 
-            if msg_id:
-                try:
-                    msg = await ch.fetch_message(msg_id)
-                    await msg.edit(embed=emb)  # rafraîchit timers toutes 5 min
-                    if last != sig:
-                        print(f"[METEO] {cont}: nouvelles valeurs journalières (signature changée).")
-                        weather_state["last_sig"][cont]  = sig
-                        weather_state["last_date"][cont] = local.strftime("%Y%m%d")
-                    else:
-                        print(f"[METEO] {cont}: timers rafraîchis (même journée).")
-                except discord.NotFound:
-                    print(f"[METEO] {cont}: ancien message introuvable → recréation.")
-                    new = await ch.send(embed=emb)
-                    weather_state["messages"][cont] = new.id
-                    weather_state["last_sig"][cont]  = sig
-                    weather_state["last_date"][cont] = local.strftime("%Y%m%d")
-                except discord.Forbidden:
-                    print(f"[METEO] {cont}: Forbidden (pas la permission d’éditer/écrire dans #{ch}).")
-                    return
-            else:
-                new = await ch.send(embed=emb)
-                weather_state["messages"][cont] = new.id
-                weather_state["last_sig"][cont]  = sig
-                weather_state["last_date"][cont] = local.strftime("%Y%m%d")
-                print(f"[METEO] {cont}: message créé (id={new.id}).")
-
-            weather_state_save(weather_state)
-            await asyncio.sleep(1)  # anti-rafale
-        except Exception as e:
-            print(f"[METEO] {cont}: erreur → {e}")
+async def _reject_unknown_continent(interaction: discord.Interaction, cont: str) -> bool:
+    # les choix sont figés à la synchronisation : un rechargement climatique peut retirer un continent
+    if cont in CONTINENT_ZONES:
+        return False
+    await interaction.response.send_message("❌ Continent absent de la configuration actuelle.", ephemeral=True)
+    return True
+
+@tree.command(name="saison", description="Saison actuelle d’un continent (réponse privée)")
+@app_commands.describe(continent="Continent")
+@app_commands.choices(continent=CONTINENT_CHOICES)
+@app_commands.checks.cooldown(1, COMMAND_COOLDOWN_S, key=lambda i: i.user.id)
+async def cmd_saison(interaction: discord.Interaction, continent: app_commands.Choice[str]):
+    if await _reject_unknown_continent(interaction, continent.value):
+        return
+    emb, _, _ = render_season(continent.value, utc_now())
+    metrics.inc("botrp_commands_total", command="saison")
+    await interaction.response.send_message(embed=emb, ephemeral=True)
+
+@tree.command(name="meteo", description="Météo d’un continent, aujourd’hui ou à une date donnée (réponse privée)")
+@app_commands.rename(quand="date")
+@app_commands.describe(continent="Continent", quand="Date locale : AAAA-MM-JJ, JJ/MM/AAAA ou JJ/MM (défaut : aujourd’hui)")
+@app_commands.choices(continent=CONTINENT_CHOICES)
+@app_commands.checks.cooldown(1, COMMAND_COOLDOWN_S, key=lambda i: i.user.id)
+async def cmd_meteo(interaction: discord.Interaction, continent: app_commands.Choice[str], quand: Optional[str] = None):
+    if await _reject_unknown_continent(interaction, continent.value):
+        return
+    now   = utc_now()
+    today = local_day(continent.value, now).day
+    day   = parse_local_date(quand, today) if quand else today
+    if day is None:
+        await interaction.response.send_message("❌ Date invalide : AAAA-MM-JJ, JJ/MM/AAAA ou JJ/MM.", ephemeral=True)
+        return
+    if abs((day - today).days) > FORECAST_MAX_DAYS:
+        await interaction.response.send_message(f"❌ Date hors plage (± {FORECAST_MAX_DAYS} jours).", ephemeral=True)
+        return
+    emb, _, _ = render_meteo(continent.value, now) if day == today else render_forecast(continent.value, day)
+    metrics.inc("botrp_commands_total", command="meteo")
+    await interaction.response.send_message(embed=emb, ephemeral=True)
+
+@tree.command(name="historique", description="Météo archivée d’un continent sur une période (réponse privée)")
+@app_commands.describe(continent="Continent", debut="Premier jour (défaut : 6 jours avant fin)",
+                       fin="Dernier jour (défaut : aujourd’hui)", biome="Limiter à un biome")
+@app_commands.choices(continent=CONTINENT_CHOICES)
+@app_commands.checks.cooldown(1, COMMAND_COOLDOWN_S, key=lambda i: i.user.id)
+async def cmd_historique(interaction: discord.Interaction, continent: app_commands.Choice[str],
+                         debut: Optional[str] = None, fin: Optional[str] = None, biome: Optional[str] = None):
+    if history is None:
+        await interaction.response.send_message("❌ Historique désactivé (HISTORY_DB).", ephemeral=True)
+        return
+    if await _reject_unknown_continent(interaction, continent.value):
+        return
+    today = local_day(continent.value, utc_now()).day
+    end   = parse_local_date(fin, today) if fin else today
+    start = parse_local_date(debut, today) if debut else None
+    if start is None and not debut and end is not None:
+        start = end - timedelta(days=6)
+    if start is None or end is None:
+        await interaction.response.send_message("❌ Date invalide : AAAA-MM-JJ, JJ/MM/AAAA ou JJ/MM.", ephemeral=True)
+        return
+    if start > end:
+        start, end = end, start
+    if (end - start).days >= HISTORY_MAX_RANGE:
+        await interaction.response.send_message(f"❌ Période trop longue ({HISTORY_MAX_RANGE} jours max).", ephemeral=True)
+        return
+    metrics.inc("botrp_commands_total", command="historique")
+    await interaction.response.send_message(embed=history_embed(continent.value, start, end, biome), ephemeral=True)
+
+@cmd_historique.autocomplete("biome")
+async def _historique_biomes(interaction: discord.Interaction, current: str) -> list:
+    cont  = getattr(interaction.namespace, "continent", None)
+    conts = [cont] if cont in CLIMATE.cont_index else CLIMATE.continents
+    names = sorted({b for c in conts for b in CLIMATE.biome_short[CLIMATE.cont_index[c]]})
+    return [app_commands.Choice(name=n, value=n) for n in names if current.lower() in n.lower()][:25]
+
+@tree.error
+async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    if isinstance(error, app_commands.CommandOnCooldown):
+        text = f"⏳ Patiente encore {error.retry_after:.0f} s avant de relancer cette commande."
+    elif isinstance(error, app_commands.MissingPermissions):
+        text = "⛔ Permission insuffisante."
+    else:
+        log_diag.error("commande en échec", exc_info=error,
+                       extra=kv(command=getattr(interaction.command, "qualified_name", "?"), err=error))
+        text = "❌ Erreur interne, réessaie plus tard."
+    try:
+        if interaction.response.is_done():
+            await interaction.followup.send(text, ephemeral=True)
+        else:
+            await interaction.response.send_message(text, ephemeral=True)
+    except discord.HTTPException:
+        pass
 
-async def weather_tick():
-    await client.wait_until_ready()
-    while not client.is_closed():
-        try:
-            # On régénère/rafraîchit ; l’embed reconstruit gère à la fois timers et bascule à minuit local.
-            await weather_ensure_messages()
-        except Exception as e:
-            print("⚠️ weather_tick:", e)
-        await asyncio.sleep(60)  # 5 min
+@client.event
+async def on_raw_message_delete(payload: discord.RawMessageDeleteEvent):
+    if payload.message_id in _TRACKED:
+        on_tracked_messages_deleted([payload.message_id])
 
-# ──────────────────────── on_ready & lancement ────────────────────────
+@client.event
+async def on_raw_bulk_message_delete(payload: discord.RawBulkMessageDeleteEvent):
+    ids = [i for i in payload.message_ids if i in _TRACKED]
+    if ids:
+        on_tracked_messages_deleted(ids)
 
 @client.event
-async def on_ready():
-    print(f"✅ Connecté comme {client.user} (ID: {client.user.id})")
-    print(f"[DIAG] CHANNEL_SAISON={CHANNEL_SAISON}, CHANNEL_METEO={CHANNEL_METEO}, CHANNEL_LOG={CHANNEL_LOG}")
+async def on_guild_remove(guild: discord.Guild):
+    cfg = guild_config.get(str(guild.id), {})
+    for kind, chan_id in list(cfg.items()):
+        forget_channel_state(kind, guild.id, chan_id)
+        forget_channel(chan_id)
+        set_guild_channel(guild.id, kind, None)
+
+# ──────────────────────── Démarrage & lancement ────────────────────────
+# setup_hook s’exécute une seule fois par processus, avant la connexion gateway :
+# tout ce qui est lancé ici ne sera jamais dupliqué par une reconnexion.
+# Les passes initiales passent par l’API REST et tournent pendant la connexion.
 
-    # Ping diag pour vérifier l’accès aux salons
+DIAG_PINGS = _env_int("DIAG_PINGS", 1)  # 0 : pas de message de test dans les salons au démarrage
+
+_METRICS_HTTP = None  # aiohttp AppRunner
+startup_done  = asyncio.Event()  # fin de la passe initiale (le planificateur l’attend)
+
+async def startup_checks():
+    """Accès aux salons configurés (et ping de test si DIAG_PINGS), en parallèle."""
     async def _chk(chan_id: int, label: str):
-        if not chan_id:
-            print(f"[DIAG] {label}: ID manquant (0).")
-            return None
-        ch = client.get_channel(chan_id)
-        if ch is None:
-            try:
-                ch = await client.fetch_channel(chan_id)
-            except Exception as e:
-                print(f"[DIAG] {label}: fetch_channel({chan_id}) a échoué: {e}")
-                return None
-        print(f"[DIAG] {label}: OK → {ch} (type={type(ch)})")
+        ch = await _get_text_channel(chan_id, label)
+        if ch is None or not DIAG_PINGS:
+            return
         try:
-            await ch.send(f"🔎 Ping {label} depuis bot {client.user} (test diag).")
-            print(f"[DIAG] {label}: message test envoyé.")
+            await dispatcher.submit(ch.id, ("ping", label), lambda: timed_rest(
+                "POST message", ch.send(f"🔎 Ping {label} depuis bot {client.user} (test diag).")), PRIO_REFRESH)
+            log_diag.info("message test envoyé", extra=kv(panel=label))
         except Exception as e:
-            print(f"[DIAG] {label}: échec envoi message test: {e}")
-        return ch
+            log_diag.error("échec envoi message test", extra=kv(panel=label, err=e))
 
-    await _chk(CHANNEL_LOG,   "LOG")
-    await _chk(CHANNEL_SAISON,"SAISON")
-    await _chk(CHANNEL_METEO, "METEO")
+    await asyncio.gather(_chk(CHANNEL_LOG, "LOG"), _chk(CHANNEL_SAISON, "SAISON"), _chk(CHANNEL_METEO, "METEO"))
 
-    if CHANNEL_LOG:
+async def startup():
+    t0 = time.perf_counter()
+    try:
+        rebuild_message_index()
+        steps = {"salons": startup_checks(), "saisons": seasons_ensure_messages(), "météo": weather_ensure_messages()}
+        results = await asyncio.gather(*steps.values(), return_exceptions=True)
+        for step, res in zip(steps, results):
+            if isinstance(res, Exception):
+                log_panel.error("échec de la passe initiale", exc_info=res, extra=kv(step=step, err=res))
+    finally:
+        startup_done.set()
+    log_diag.info("démarrage terminé", extra=kv(duration_s=round(time.perf_counter() - t0, 2)))
+
+    logch = _CHANNELS.get(CHANNEL_LOG)
+    if logch is not None:
         try:
-            logch = client.get_channel(CHANNEL_LOG) or await client.fetch_channel(CHANNEL_LOG)
-            await logch.send("✅ Bot opérationnel (saisons + météo).")
+            await dispatcher.submit(logch.id, "ready", lambda: timed_rest(
+                "POST message", logch.send("✅ Bot opérationnel (saisons + météo).")))
         except Exception as e:
-            print(f"⚠️ log: {e}")
+            log_diag.error("salon de log inaccessible", extra=kv(err=e))
 
+@client.event
+async def setup_hook():
+    global _METRICS_HTTP
+    log_diag.info("configuration", extra=kv(saison=CHANNEL_SAISON, meteo=CHANNEL_METEO, log=CHANNEL_LOG,
+                                             guilds_config=len(guild_config), diag_pings=DIAG_PINGS))
     try:
-        await seasons_ensure_messages()
+        synced = await tree.sync()
+        log_diag.info("commandes slash synchronisées", extra=kv(n=len(synced)))
     except Exception as e:
-        print(f"⚠️ init saisons: {e}")
+        log_diag.error("sync des commandes impossible", extra=kv(err=e))
 
-    try:
-        await weather_ensure_messages()
-    except Exception as e:
-        print(f"⚠️ init météo: {e}")
+    if METRICS_PORT:
+        try:
+            _METRICS_HTTP = await start_metrics_server()
+        except OSError as e:
+            log_diag.error("serveur de métriques indisponible", extra=kv(port=METRICS_PORT, err=e))
 
-    client.loop.create_task(seasons_tick())
-    client.loop.create_task(weather_tick())
+    supervisor.start("demarrage", startup, restart=False)
+    supervisor.start("planificateur", scheduler_tick)
+    if CLIMATE_POLL_S > 0:
+        supervisor.start("climat", climate_watch)
+
+@client.event
+async def on_ready():
+    # appelé à chaque reconnexion : journalisation seulement, aucune tâche lancée ici
+    log_diag.info("connecté", extra=kv(user=client.user, id=client.user.id, guilds=len(client.guilds),
+                                       tasks=",".join(supervisor.running())))
 
 # ──────────────────────────────────────────────────────────────────────
+async def run_bot():
+    """Équivalent de client.run, avec fermeture des tâches et de la session webhook."""
+    try:
+        async with client:
+            await client.start(TOKEN)
+    finally:
+        await supervisor.stop()
+        await close_webhook_session()
+        if _METRICS_HTTP is not None:
+            await _METRICS_HTTP.cleanup()
+
 if __name__ == "__main__":
+    discord.utils.setup_logging(root=False)  # journaux de discord.py, comme client.run
     try:
-        client.run(TOKEN)
+        asyncio.run(run_bot())
+    except KeyboardInterrupt:
+        pass
     except discord.LoginFailure:
-        print("❌ Token Discord invalide. Régénère-le et mets-le dans DISCORD_TOKEN.")
+        log_diag.critical("Token Discord invalide. Régénère-le et mets-le dans DISCORD_TOKEN.")
         sys.exit(1)
+    finally:
+        state_saver.flush_sync()  # sauvegardes en attente (debounce)
+        state_store.close()
+        if history is not None:
+            history.close()
+        _log_listener.stop()
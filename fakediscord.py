@@ -0,0 +1,343 @@
+# fakediscord.py
+# ──────────────────────────────────────────────────────────────────────────────
+# Doublure en mémoire de la surface discord.py utilisée par bot.py
+# (Client / TextChannel / Message / PartialMessage) pour bench.py :
+# – enregistre chaque appel REST (route, salon, message, heure virtuelle)
+# – injecte latence, 429, NotFound et Forbidden
+# – VirtualClockLoop : boucle asyncio dont l’horloge avance instantanément
+#   quand elle n’a plus rien à faire (des mois de ticks en quelques secondes)
+# ──────────────────────────────────────────────────────────────────────────────
+
+import asyncio, random, selectors
+from collections import Counter, deque
+import discord
+
+# ──────────────── Horloge virtuelle ────────────────
+
+class _InstantSelector(selectors.BaseSelector):
+    """Délègue au vrai sélecteur (self-pipe) sans jamais bloquer ; avance l’horloge à la place."""
+
+    def __init__(self):
+        self._inner = selectors.DefaultSelector()
+        self.loop   = None
+
+    def register(self, fileobj, events, data=None):
+        return self._inner.register(fileobj, events, data)
+
+    def unregister(self, fileobj):
+        return self._inner.unregister(fileobj)
+
+    def modify(self, fileobj, events, data=None):
+        return self._inner.modify(fileobj, events, data)
+
+    def get_map(self):
+        return self._inner.get_map()
+
+    def close(self):
+        self._inner.close()
+
+    def select(self, timeout=None):
+        if self.loop is not None and self.loop.busy_threads and timeout != 0:
+            # travail en cours dans un thread (run_in_executor) : on attend vraiment son
+            # réveil (self-pipe) au lieu de sauter l’horloge par-dessus
+            return self._inner.select(None)
+        ready = self._inner.select(0)
+        if not ready and timeout and self.loop is not None:
+            self.loop.advance(timeout)
+        return ready
+
+class VirtualClockLoop(asyncio.SelectorEventLoop):
+    def __init__(self):
+        sel = _InstantSelector()
+        super().__init__(selector=sel)
+        sel.loop = self
+        self._virtual = 0.0
+        self.busy_threads = 0
+
+    def run_in_executor(self, executor, func, *args):
+        fut = super().run_in_executor(executor, func, *args)
+        self.busy_threads += 1
+        fut.add_done_callback(self._thread_done)
+        return fut
+
+    def _thread_done(self, _):
+        self.busy_threads -= 1
+
+    def time(self) -> float:
+        return self._virtual
+
+    def advance(self, seconds: float):
+        self._virtual += max(0.0, seconds)
+
+# ──────────────── Transport factice ────────────────
+
+class _FakeResponse:
+    def __init__(self, status: int, reason: str, headers: dict = None):
+        self.status  = status
+        self.reason  = reason
+        self.headers = headers or {}
+
+def not_found() -> discord.NotFound:
+    return discord.NotFound(_FakeResponse(404, "Not Found"), {"code": 10008, "message": "Unknown Message"})
+
+def forbidden() -> discord.Forbidden:
+    return discord.Forbidden(_FakeResponse(403, "Forbidden"), {"code": 50013, "message": "Missing Permissions"})
+
+def server_error() -> discord.DiscordServerError:
+    return discord.DiscordServerError(_FakeResponse(500, "Internal Server Error"), {"code": 0, "message": "500: Internal Server Error"})
+
+def too_many_webhooks() -> discord.HTTPException:
+    return discord.HTTPException(_FakeResponse(400, "Bad Request"), {"code": 30007, "message": "Maximum number of webhooks reached (15)"})
+
+def too_many_requests(retry_after: float) -> discord.HTTPException:
+    return discord.HTTPException(
+        _FakeResponse(429, "Too Many Requests", {"Retry-After": str(retry_after)}),
+        {"code": 0, "message": "You are being rate limited."},
+    )
+
+class FakeTransport:
+    """
+    Journal des appels + injection de pannes.
+      latency             : secondes (horloge de la boucle) par requête
+      p_429 / p_not_found : probabilités d’erreur spontanée par requête
+      forbidden           : IDs de salons où toute écriture lève Forbidden
+      no_webhooks         : IDs de salons sans la permission « Gérer les webhooks »
+      server_errors       : route -> nombre de prochaines requêtes à faire échouer en 500
+      max_webhooks        : webhooks par salon au-delà desquels la création échoue (400, code 30007)
+      enforce_limits      : applique la limite réelle de Discord (5 écritures / 5 s / salon)
+    """
+
+    RATE_LIMIT, RATE_WINDOW = 5, 5.0
+
+    def __init__(self, latency: float = 0.0, p_429: float = 0.0, p_not_found: float = 0.0,
+                 forbidden: set = None, enforce_limits: bool = True, seed: int = 0, no_webhooks: set = None):
+        self.latency     = latency
+        self.p_429       = p_429
+        self.p_not_found = p_not_found
+        self.forbidden   = set(forbidden or ())
+        self.no_webhooks = set(no_webhooks or ())
+        self.server_errors = Counter()
+        self.max_webhooks  = 15
+        self.enforce_limits = enforce_limits
+        self.rng      = random.Random(seed)
+        self.calls    = []         # (heure_boucle, route, chan_id, msg_id, statut)
+        self.routes   = Counter()  # route -> nb
+        self.errors   = Counter()  # statut -> nb
+        self.messages = {}         # msg_id -> FakeMessage
+        self.on_delete = []        # rappels « gateway » : f([msg_id, …])
+        self._recent  = {}         # chan_id -> deque des heures des dernières écritures
+        self.bot_user = None       # renseigné par FakeClient (auteur des webhooks créés)
+        self._next_id = 1_000_000
+
+    def new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    async def request(self, route: str, chan_id: int, msg_id: int = None, write: bool = True, author: str = "bot"):
+        loop = asyncio.get_running_loop()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        now, status = loop.time(), 200
+        try:
+            if self.server_errors[route] > 0:
+                self.server_errors[route] -= 1
+                status = 500
+                raise server_error()
+            if write and chan_id in self.forbidden:
+                status = 403
+                raise forbidden()
+            if write and self.enforce_limits:
+                recent = self._recent.setdefault(chan_id, deque())
+                while recent and now - recent[0] >= self.RATE_WINDOW:
+                    recent.popleft()
+                if len(recent) >= self.RATE_LIMIT:
+                    status = 429
+                    raise too_many_requests(self.RATE_WINDOW - (now - recent[0]))
+                recent.append(now)
+            if self.p_429 and self.rng.random() < self.p_429:
+                status = 429
+                raise too_many_requests(1.0)
+            if msg_id is not None and msg_id not in self.messages:
+                status = 404
+                raise not_found()
+            if msg_id is not None and write and self.messages[msg_id].author != author:
+                # le bot ne peut pas éditer un message de webhook ; un webhook ne voit que les siens
+                status = 404 if author != "bot" else 403
+                raise not_found() if author != "bot" else forbidden()
+            if msg_id is not None and self.p_not_found and self.rng.random() < self.p_not_found:
+                self.messages.pop(msg_id, None)  # supprimé « par un modérateur »
+                status = 404
+                raise not_found()
+        finally:
+            self.calls.append((now, route, chan_id, msg_id, status))
+            self.routes[route] += 1
+            if status != 200:
+                self.errors[status] += 1
+
+    def delete_message(self, msg_id: int):
+        """Suppression hors bot (modérateur, purge…) : émet l’équivalent de on_raw_message_delete."""
+        self.messages.pop(msg_id, None)
+        for cb in self.on_delete:
+            cb([msg_id])
+
+# ──────────────── Objets Discord factices ────────────────
+
+class FakeUser:
+    def __init__(self, user_id: int, name: str):
+        self.id   = user_id
+        self.name = name
+
+    def __str__(self):
+        return self.name
+
+class FakeGuild:
+    def __init__(self, guild_id: int, name: str = "RP"):
+        self.id   = guild_id
+        self.name = name
+
+class FakeMessage:
+    def __init__(self, channel: "FakeTextChannel", msg_id: int, content=None, embeds=None, author: str = "bot"):
+        self.channel = channel
+        self.id      = msg_id
+        self.content = content
+        self.embeds  = list(embeds or [])
+        self.author  = author
+
+    async def edit(self, *, content=None, embed=None, embeds=None, **_):
+        return await self.channel.get_partial_message(self.id).edit(content=content, embed=embed, embeds=embeds)
+
+    async def delete(self):
+        await self.channel.get_partial_message(self.id).delete()
+
+class FakePartialMessage:
+    def __init__(self, channel: "FakeTextChannel", msg_id: int):
+        self.channel = channel
+        self.id      = msg_id
+
+    async def edit(self, *, content=None, embed=None, embeds=None, **_):
+        t = self.channel.transport
+        await t.request("PATCH /channels/{id}/messages/{id}", self.channel.id, self.id)
+        msg = t.messages[self.id]
+        if content is not None:
+            msg.content = content
+        if embed is not None or embeds is not None:
+            msg.embeds = [embed] if embed is not None else list(embeds)
+        return msg
+
+    async def delete(self):
+        t = self.channel.transport
+        await t.request("DELETE /channels/{id}/messages/{id}", self.channel.id, self.id)
+        t.messages.pop(self.id, None)
+
+class FakeWebhook:
+    def __init__(self, channel: "FakeTextChannel", hook_id: int, name: str, user):
+        self.channel = channel
+        self.id      = hook_id
+        self.token   = f"token-{hook_id}"
+        self.name    = name
+        self.user    = user
+
+    @property
+    def author(self) -> str:
+        return f"webhook:{self.id}"
+
+    async def send(self, content=None, *, embed=None, embeds=None, wait=False, **_):
+        ch, t = self.channel, self.channel.transport
+        await t.request("POST /webhooks/{id}/{token}", ch.id, author=self.author)
+        msg = FakeMessage(ch, t.new_id(), content, [embed] if embed is not None else embeds, author=self.author)
+        t.messages[msg.id] = msg
+        return msg if wait else None
+
+    async def edit_message(self, msg_id: int, *, content=None, embeds=None, **_):
+        t = self.channel.transport
+        await t.request("PATCH /webhooks/{id}/{token}/messages/{id}", self.channel.id, msg_id, author=self.author)
+        msg = t.messages[msg_id]
+        if content is not None:
+            msg.content = content
+        if embeds is not None:
+            msg.embeds = list(embeds)
+        return msg
+
+    async def delete_message(self, msg_id: int):
+        t = self.channel.transport
+        await t.request("DELETE /webhooks/{id}/{token}/messages/{id}", self.channel.id, msg_id, author=self.author)
+        t.messages.pop(msg_id, None)
+
+class FakeTextChannel:
+    def __init__(self, transport: FakeTransport, chan_id: int, guild: FakeGuild, name: str = "annonces"):
+        self.transport = transport
+        self.id        = chan_id
+        self.guild     = guild
+        self.name      = name
+        self._webhooks = []
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def mention(self) -> str:
+        return f"<#{self.id}>"
+
+    def get_partial_message(self, msg_id: int) -> FakePartialMessage:
+        return FakePartialMessage(self, msg_id)
+
+    async def fetch_message(self, msg_id: int) -> FakeMessage:
+        await self.transport.request("GET /channels/{id}/messages/{id}", self.id, msg_id, write=False)
+        return self.transport.messages[msg_id]
+
+    async def webhooks(self) -> list:
+        t = self.transport
+        await t.request("GET /channels/{id}/webhooks", self.id, write=False)
+        if self.id in t.no_webhooks:
+            raise forbidden()
+        return list(self._webhooks)
+
+    async def create_webhook(self, *, name: str, **_) -> FakeWebhook:
+        t = self.transport
+        await t.request("POST /channels/{id}/webhooks", self.id, write=False)  # hors limite des messages
+        if self.id in t.no_webhooks:
+            raise forbidden()
+        if len(self._webhooks) >= t.max_webhooks:
+            raise too_many_webhooks()
+        hook = FakeWebhook(self, t.new_id(), name, t.bot_user)
+        self._webhooks.append(hook)
+        return hook
+
+    async def send(self, content=None, *, embed=None, embeds=None, **_) -> FakeMessage:
+        t = self.transport
+        await t.request("POST /channels/{id}/messages", self.id)
+        msg = FakeMessage(self, t.new_id(), content, [embed] if embed is not None else embeds)
+        t.messages[msg.id] = msg
+        return msg
+
+class FakeClient:
+    def __init__(self, transport: FakeTransport):
+        self.transport = transport
+        self.channels  = {}
+        self.guilds    = []
+        self.user      = FakeUser(1, "bench#0000")
+        transport.bot_user = self.user
+        self._closed   = False
+
+    def add_channel(self, chan_id: int, guild_id: int, name: str = "annonces") -> FakeTextChannel:
+        guild = next((g for g in self.guilds if g.id == guild_id), None)
+        if guild is None:
+            guild = FakeGuild(guild_id)
+            self.guilds.append(guild)
+        ch = self.channels[chan_id] = FakeTextChannel(self.transport, chan_id, guild, name)
+        return ch
+
+    def get_channel(self, chan_id: int):
+        return self.channels.get(chan_id)
+
+    async def fetch_channel(self, chan_id: int):
+        await self.transport.request("GET /channels/{id}", chan_id, write=False)
+        if chan_id not in self.channels:
+            raise not_found()
+        return self.channels[chan_id]
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    async def close(self):
+        self._closed = True